@@ -0,0 +1,42 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    stt_model: str = "nemo-parakeet-tdt-0.6b-v3"
+    stt_quantization: str = ""  # "int8" = quantized model, much faster on CPU-only nodes
+    stt_providers: str = ""  # comma-separated onnxruntime providers; empty = all available
+    stt_intra_op_threads: int = 0  # 0 = one per core; set cores / recognition workers on CPU
+    stt_inter_op_threads: int = 0  # 0 = run operators sequentially
+    stt_graph_optimization: str = "all"  # "disable" | "basic" | "extended" | "all"
+    stt_graph_cache_dir: str = "/app/.cache/onnx-optimized"  # optimized graphs; empty = off
+    stt_warmup: bool = True  # run a synthetic recognition before reporting ready
+    stt_vad_threshold: float = 0.5  # speech probability that starts a segment
+    stt_vad_min_silence_ms: int = 100  # shorter pauses do not split a segment
+    stt_vad_speech_pad_ms: int = 30
+    stt_vad_max_speech_s: float = 180  # longer speech is split
+    stt_recognition_workers: int = 1  # concurrent recognitions, each on its own thread
+    stt_max_queue: int = 4  # requests that may wait for a recognition; more get 429
+    stt_decode_workers: int = 2  # concurrent ffmpeg decodes
+    stt_batch_window_ms: int = 20  # wait this long for more speech segments to fill a batch
+    stt_max_batch: int = 8  # speech segments per recognition batch
+    stt_max_batch_seconds: float = 240  # audio per recognition batch, bounds padding memory
+    stt_cache_dir: str = "/app/.cache/stt-transcripts"  # transcripts by upload and PCM hash
+    stt_cache_ttl_days: int = 30
+    stt_cache_max_mb: int = 256  # least recently used transcripts are evicted beyond this
+    stt_jobs_dir: str = "/app/.cache/stt-jobs"  # job state and audio of queued transcription jobs
+    stt_job_workers: int = 1  # jobs transcribed at once
+    stt_job_segments_in_flight: int = 16  # speech segments of one job recognizing at once
+    stt_job_max_queued: int = 20  # queued jobs; more get 429
+    stt_job_retention_hours: float = 24  # keep finished jobs this long
+    stt_max_streams: int = 4  # concurrent WebSocket streaming sessions
+    stt_stream_step_ms: int = 500  # run the VAD over a live stream after this much new audio
+    stt_stream_silence_ms: int = 600  # silence that ends a streamed speech segment
+    stt_stream_partial_interval_ms: int = 1000  # min time between partial results; 0 = none
+    stt_stream_max_segment_s: float = 20  # longer speech is cut into segments of this length
+    stt_trace_dir: str = ""  # write per-request stage traces here as JSON; empty = off
+    stt_trace_sample_rate: float = 1.0  # fraction of requests to trace when enabled
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+settings = Settings()
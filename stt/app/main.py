@@ -5,20 +5,130 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.routers.stt import load_model, router as stt_router
+from app.config import settings
+from app.metrics import (
+    JOBS_QUEUED,
+    QUEUE_DEPTH,
+    RECOGNITIONS_RUNNING,
+    SEGMENTS_PENDING,
+    STREAMS_OPEN,
+    MetricsMiddleware,
+)
+from app.routers.stt import (
+    LOAD_STATE,
+    MAX_FILE_BYTES,
+    load_model,
+    model_id,
+    recognize_batch,
+    router as stt_router,
+    segment_speech,
+)
+from app.services.batching import SegmentBatcher
+from app.services.jobs import JobQueue
+from app.services.recognition import RecognitionPool
+from app.services.transcript_cache import TranscriptCache
 
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 _origin = os.getenv("ORIGIN", "http://localhost:3000")
 ALLOWED_ORIGINS = list({_origin, "http://localhost:3000", "http://127.0.0.1:3000"})
 
+_UPLOAD_PATHS = {"/api/stt", "/api/stt/jobs"}
+# Room for the multipart boundaries and part headers around the file
+_FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadLimitMiddleware:
+    """Rejects uploads that declare an oversized body before receiving it.
+
+    The upload handlers stop reading once the file passes the limit, which
+    also covers chunked uploads without a Content-Length; a declared
+    Content-Length over the limit is answered here straight away.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self._max_bytes = max_bytes + _FORM_OVERHEAD_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in _UPLOAD_PATHS:
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > self._max_bytes:
+                response = JSONResponse(
+                    {"detail": "Audiobestand te groot (max 200 MB)"}, status_code=413
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+async def _load_models(jobs: JobQueue) -> None:
+    try:
+        # Load in a thread so the event loop keeps answering health checks
+        await asyncio.to_thread(load_model)
+    except Exception as exc:
+        logger.exception("Loading the models failed")
+        LOAD_STATE.finish(error=str(exc) or type(exc).__name__)
+        return
+    # Workers start after the models are loaded, so requeued jobs can run
+    jobs.start_workers()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load the Parakeet model in a thread so the event loop stays free
-    await asyncio.to_thread(load_model)
+    recognition = RecognitionPool(
+        workers=settings.stt_recognition_workers,
+        max_queue=settings.stt_max_queue,
+        decode_workers=settings.stt_decode_workers,
+        max_streams=settings.stt_max_streams,
+    )
+    QUEUE_DEPTH.set_function(recognition.waiting)
+    RECOGNITIONS_RUNNING.set_function(recognition.running)
+    STREAMS_OPEN.set_function(recognition.streams)
+    app.state.recognition = recognition
+    batcher = SegmentBatcher(
+        recognize_batch,
+        recognition.run,
+        concurrency=settings.stt_recognition_workers,
+        window_ms=settings.stt_batch_window_ms,
+        max_batch=settings.stt_max_batch,
+        max_batch_seconds=settings.stt_max_batch_seconds,
+    )
+    SEGMENTS_PENDING.set_function(batcher.pending)
+    app.state.batcher = batcher
+    cache = TranscriptCache(
+        settings.stt_cache_dir,
+        model_id(),
+        ttl_days=settings.stt_cache_ttl_days,
+        max_bytes=settings.stt_cache_max_mb * 1024 * 1024,
+    )
+    await cache.load()
+    app.state.cache = cache
+    jobs = JobQueue(
+        segment_speech,
+        batcher.recognize,
+        recognition.run,
+        settings.stt_jobs_dir,
+        workers=settings.stt_job_workers,
+        segments_in_flight=settings.stt_job_segments_in_flight,
+        retention_hours=settings.stt_job_retention_hours,
+        store=cache.put,
+    )
+    JOBS_QUEUED.set_function(jobs.queued)
+    await jobs.start()
+    app.state.jobs = jobs
+    # Serve health checks while the models load; requests get 503 until ready
+    loading = asyncio.create_task(_load_models(jobs))
     yield
+    loading.cancel()
+    await jobs.close()
+    batcher.close()
+    recognition.close()
 
 
 app = FastAPI(title="Memories Backend", version="0.2.0", lifespan=lifespan)
@@ -31,9 +141,35 @@ app.add_middleware(
     allow_headers=["Content-Type"],
 )
 
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_FILE_BYTES)
+
+app.add_middleware(
+    MetricsMiddleware,
+    trace_dir=settings.stt_trace_dir,
+    trace_sample_rate=settings.stt_trace_sample_rate,
+)
+
 app.include_router(stt_router)
 
 
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok", "service": "memories-backend"}
+
+
+@app.get("/health/live")
+async def liveness() -> JSONResponse:
+    """Whether the process is healthy; fails only when loading the models failed."""
+    status = 503 if LOAD_STATE.status == "failed" else 200
+    return JSONResponse({"status": LOAD_STATE.status}, status_code=status)
+
+
+@app.get("/health/ready")
+async def readiness() -> JSONResponse:
+    """Whether requests can be served, with the timing of each load phase."""
+    return JSONResponse(LOAD_STATE.as_dict(), status_code=200 if LOAD_STATE.ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
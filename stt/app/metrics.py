@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Metrics are always on: observing a histogram costs about a microsecond.
+# Traces are only collected for requests sampled by MetricsMiddleware.
+_SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "stt_stage_seconds", "Time spent per processing stage", ["stage"], buckets=_SLOW_BUCKETS
+)
+AUDIO_SECONDS = Counter("stt_audio_seconds", "Audio transcribed")
+REALTIME_FACTOR = Histogram(
+    "stt_realtime_factor", "Audio seconds transcribed per compute second",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+MODEL_LOAD_SECONDS = Histogram(
+    "stt_model_load_seconds", "Time to load a model into memory", ["model"],
+    buckets=_SLOW_BUCKETS,
+)
+QUEUE_DEPTH = Gauge("stt_queue_depth", "Admitted requests not recognizing yet")
+RECOGNITIONS_RUNNING = Gauge("stt_recognitions_running", "Recognitions running on worker threads")
+STREAMS_OPEN = Gauge("stt_streams_open", "Open WebSocket streaming sessions")
+JOBS_QUEUED = Gauge("stt_jobs_queued", "Transcription jobs waiting for a worker")
+SEGMENTS_PENDING = Gauge("stt_segments_pending", "Speech segments waiting for a recognition batch")
+BATCH_SIZE = Histogram(
+    "stt_batch_size", "Speech segments per recognition batch", buckets=(1, 2, 4, 8, 16, 32)
+)
+QUEUE_REJECTED = Counter("stt_queue_rejected", "Requests rejected with 429 on a full queue")
+QUEUE_WAIT_SECONDS = Histogram(
+    "stt_queue_wait_seconds", "Wait for a free recognition worker", buckets=_SLOW_BUCKETS
+)
+IN_FLIGHT = Gauge("stt_http_requests_in_flight", "HTTP requests being served")
+REQUEST_SECONDS = Histogram(
+    "stt_http_request_seconds", "HTTP request duration", ["method", "route", "status"],
+    buckets=_SLOW_BUCKETS,
+)
+
+# (start time, spans) of the request being traced in this context, if any
+_trace: contextvars.ContextVar[tuple[float, list[dict]] | None] = contextvars.ContextVar(
+    "stt_trace", default=None
+)
+
+
+@contextmanager
+def timed(span: str, histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the duration of the block and add it to the current trace."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        histogram.labels(**labels).observe(elapsed)
+        trace = _trace.get()
+        if trace is not None:
+            trace[1].append({
+                "span": span,
+                "start_ms": round((t0 - trace[0]) * 1000, 3),
+                "ms": round(elapsed * 1000, 3),
+            })
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    return timed(name, STAGE_SECONDS, stage=name)
+
+
+def observe_realtime(audio_seconds: float, compute_seconds: float) -> None:
+    """Record transcribed audio and the real-time factor of one recognition."""
+    AUDIO_SECONDS.inc(audio_seconds)
+    if compute_seconds > 0:
+        REALTIME_FACTOR.observe(audio_seconds / compute_seconds)
+
+
+class MetricsMiddleware:
+    """Counts in-flight requests, times them per route and optionally traces them.
+
+    A sampled request is written to ``trace_dir`` as JSON with the timing of
+    every stage it went through; no directory means no tracing.
+
+    Implemented as plain ASGI so streaming responses are timed until their
+    last byte, not just until the headers are sent.
+    """
+
+    def __init__(self, app: ASGIApp, trace_dir: str = "", trace_sample_rate: float = 1.0) -> None:
+        self.app = app
+        self._trace_dir = Path(trace_dir) if trace_dir else None
+        self._sample_rate = trace_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = None
+        token = None
+        if self._trace_dir and random.random() < self._sample_rate:
+            trace_id = uuid.uuid4().hex
+            token = _trace.set((time.perf_counter(), []))
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace_id:
+                    headers = message.get("headers", [])
+                    message["headers"] = [*headers, (b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], path, str(status)).observe(elapsed)
+            if token is not None:
+                _, spans = _trace.get()
+                _trace.reset(token)
+                record = {
+                    "id": trace_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": path,
+                    "status": status,
+                    "ms": round(elapsed * 1000, 3),
+                    "spans": spans,
+                }
+                await asyncio.to_thread(self._dump, record)
+
+    def _dump(self, record: dict) -> None:
+        try:
+            self._trace_dir.mkdir(parents=True, exist_ok=True)
+            path = self._trace_dir / f"{int(time.time() * 1000)}-{record['id']}.json"
+            path.write_text(json.dumps(record))
+        except OSError:
+            logger.exception("Could not write trace %s", record["id"])
@@ -1,18 +1,57 @@
+import asyncio
+import hashlib
 import logging
-import subprocess
-import tempfile
-from pathlib import Path
+import time
+from dataclasses import replace
 
+import numpy as np
 import onnx_asr
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+
+from app.config import settings
+from app.metrics import MODEL_LOAD_SECONDS, observe_realtime, stage, timed
+from app.services.graph_cache import GraphCache
+from app.services.profile import InferenceProfile
+from app.services.recognition import QueueFullError
+from app.services.startup import LoadState
+from app.services.streaming import StreamingTranscriber
+from app.services.upload import MultipartUpload, UploadError
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-_vad_model = None
+_asr_model = None
+_vad = None
+PROFILE = InferenceProfile.from_settings(settings)
+LOAD_STATE = LoadState()
 
 MAX_FILE_BYTES = 200 * 1024 * 1024  # 200 MB
-MAX_DURATION_SECS = 5400  # 1 hour 30 minutes
+MAX_DURATION_SECS = 5400  # 1 hour 30 minutes; as float32 PCM up to ~345 MB per request
+SAMPLE_RATE = 16000
+_CHUNK_BYTES = 1024 * 1024
+_MAX_JOB_WAIT_SECONDS = 60
+# The upload endpoints read their body themselves; this documents it
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["audio"],
+                    "properties": {"audio": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
 SUPPORTED_TYPES = {
     "audio/wav",
@@ -27,72 +66,360 @@ SUPPORTED_TYPES = {
 }
 
 
-def load_model() -> None:
-    global _vad_model
-    logger.info("Loading parakeet-tdt-0.6b-v3 ...")
-    model = onnx_asr.load_model("nemo-parakeet-tdt-0.6b-v3")
-    logger.info("Model ready. Loading Silero VAD ...")
-    vad = onnx_asr.load_vad("silero")
-    _vad_model = model.with_vad(vad, max_speech_duration_s=180)
-    logger.info("VAD ready.")
+def model_id() -> str:
+    """Identifies everything that shapes a transcript, for the transcript cache."""
+    return PROFILE.id
 
 
-def _get_duration(wav_path: str) -> float:
-    """Get audio duration in seconds via ffprobe."""
-    proc = subprocess.run(
-        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-         "-of", "default=noprint_wrappers=1:nokey=1", wav_path],
-        capture_output=True, text=True,
+def _load(kind: str, name: str, quantization: str, graphs: GraphCache | None):
+    """Load the ASR model or VAD, from its optimized graphs when they are cached."""
+    loader, kwargs = (
+        (onnx_asr.load_model, PROFILE.model_kwargs())
+        if kind == "asr"
+        else (onnx_asr.load_vad, PROFILE.vad_kwargs())
     )
-    try:
-        return float(proc.stdout.strip())
-    except ValueError:
-        return 0.0
+    if graphs is not None:
+        try:
+            path = graphs.get(kind, name, quantization)
+            LOAD_STATE.graph_cache[name] = "hit" if path else "miss"
+            if path is None:
+                with LOAD_STATE.phase(f"resolve_{kind}"):
+                    files = graphs.resolve(kind, name, quantization)
+                with LOAD_STATE.phase(f"optimize_{kind}"):
+                    path = graphs.build(kind, name, quantization, files)
+            # The saved graphs are optimized already
+            unoptimized = replace(PROFILE, graph_optimization="disable")
+            kwargs["sess_options"] = unoptimized.session_options()
+            with LOAD_STATE.phase(f"load_{kind}"):
+                return loader(name, path, **kwargs)
+        except Exception:
+            logger.warning("Optimized graphs of %s unusable, loading directly", name, exc_info=True)
+            LOAD_STATE.graph_cache[name] = "error"
+            graphs.discard(kind, name, quantization)
+            kwargs["sess_options"] = PROFILE.session_options()
+    with LOAD_STATE.phase(f"load_{kind}"):
+        return loader(name, **kwargs)
+
+
+def _warmup(model, vad) -> None:
+    """Run the VAD and a small recognition batch once, so the first request
+    does not pay for lazy allocations and kernel selection."""
+    waveform = (np.random.default_rng(0).standard_normal(2 * SAMPLE_RATE) * 0.01).astype(np.float32)
+    list(next(vad.segment_batch(
+        waveform[None, :], np.array([len(waveform)]), SAMPLE_RATE, **PROFILE.vad_options()
+    )))
+    model.recognize([waveform, waveform[:SAMPLE_RATE]], sample_rate=SAMPLE_RATE)
 
 
-@router.post("/api/stt")
-async def speech_to_text(audio: UploadFile = File(...)):
-    """Transcribe uploaded audio to text using Parakeet TDT 0.6B v3 (ONNX) with VAD."""
-    if _vad_model is None:
+def load_model() -> None:
+    """Load and warm up the models; requests are served once this returns."""
+    global _asr_model, _vad
+    graphs = None
+    if settings.stt_graph_cache_dir:
+        graphs = GraphCache(settings.stt_graph_cache_dir, PROFILE)
+    logger.info("Loading %s with %s ...", PROFILE.model, PROFILE.describe())
+    with timed("load_parakeet", MODEL_LOAD_SECONDS, model="parakeet"):
+        model = _load("asr", PROFILE.model, PROFILE.quantization, graphs)
+    logger.info("Model ready. Loading Silero VAD ...")
+    with timed("load_silero", MODEL_LOAD_SECONDS, model="silero"):
+        vad = _load("vad", "silero", "", graphs)
+    if settings.stt_warmup:
+        with LOAD_STATE.phase("warmup"):
+            _warmup(model, vad)
+    _asr_model, _vad = model, vad
+    LOAD_STATE.finish()
+    logger.info("VAD ready. Load phases: %s", LOAD_STATE.phases)
+
+
+async def _open_upload(request: Request) -> MultipartUpload:
+    """Start reading the ``audio`` file of a multipart upload, as it arrives."""
+    if _asr_model is None:
         raise HTTPException(status_code=503, detail="Model wordt nog geladen, probeer opnieuw")
+    try:
+        upload = MultipartUpload(
+            request.headers.get("content-type", ""), request.stream(), "audio", MAX_FILE_BYTES
+        )
+        await upload.open()
+    except UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
 
-    base_type = (audio.content_type or "application/octet-stream").split(";")[0].strip()
+    base_type = upload.content_type.split(";")[0].strip()
     if base_type not in SUPPORTED_TYPES:
         raise HTTPException(status_code=415, detail=f"Niet ondersteund formaat: {base_type}")
+    return upload
 
-    audio_bytes = await audio.read()
-    if not audio_bytes:
+
+async def _decode_upload(upload: MultipartUpload) -> np.ndarray:
+    """Pipe an upload through ffmpeg into 16 kHz mono float32 PCM while it arrives.
+
+    The request body is parsed as it is received and the file goes straight
+    into ffmpeg, so it is neither spooled to disk nor held in memory; past
+    MAX_FILE_BYTES the upload is refused with 413. The decoded PCM is held
+    in memory, capped by MAX_DURATION_SECS: up to about 345 MB of float32
+    per request. Decoding stops as soon as a limit is passed.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+        "-ar", str(SAMPLE_RATE), "-ac", "1", "-f", "f32le", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    received = 0
+
+    async def feed() -> None:
+        nonlocal received
+        try:
+            while chunk := await upload.read():
+                received += len(chunk)
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+        except UploadError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg stopped reading; its exit code tells why
+        finally:
+            proc.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    stderr = asyncio.create_task(proc.stderr.read())
+    pcm = bytearray()
+    max_bytes = MAX_DURATION_SECS * SAMPLE_RATE * 4
+    try:
+        while data := await proc.stdout.read(_CHUNK_BYTES):
+            pcm += data
+            if len(pcm) > max_bytes:
+                raise HTTPException(
+                    status_code=413, detail=f"Audio te lang (max {MAX_DURATION_SECS}s)"
+                )
+        await feeder
+        await proc.wait()
+    finally:
+        feeder.cancel()
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        await asyncio.gather(feeder, stderr, return_exceptions=True)
+
+    if not received:
         raise HTTPException(status_code=400, detail="Leeg audiobestand")
-    if len(audio_bytes) > MAX_FILE_BYTES:
-        raise HTTPException(status_code=413, detail="Audiobestand te groot (max 200 MB)")
+    if proc.returncode != 0 or not pcm:
+        logger.error("ffmpeg error: %s", stderr.result()[-400:].decode(errors="replace"))
+        raise HTTPException(status_code=422, detail="Audio conversie mislukt")
+    return np.frombuffer(pcm, dtype=np.float32)
+
+
+def _hash_pcm(waveform: np.ndarray) -> str:
+    return hashlib.sha256(waveform).hexdigest()
+
+
+def segment_speech(waveform: np.ndarray) -> list[tuple[int, int]]:
+    """Start and end sample of each VAD speech segment in a waveform."""
+    batches = _vad.segment_batch(
+        waveform[None, :], np.array([len(waveform)]), SAMPLE_RATE, **PROFILE.vad_options()
+    )
+    return [(int(start), int(end)) for start, end in next(batches)]
 
-    wav_path = None
+
+def recognize_batch(waveforms: list[np.ndarray]) -> list[str]:
+    """Recognize speech segments in one padded forward pass."""
+    return _asr_model.recognize(waveforms, sample_rate=SAMPLE_RATE)
+
+
+@router.post("/api/stt", openapi_extra=_UPLOAD_OPENAPI)
+async def speech_to_text(request: Request, response: Response):
+    """Transcribe uploaded audio to text using Parakeet TDT 0.6B v3 (ONNX) with VAD.
+
+    The ``audio`` form field is decoded while it is uploaded. Transcripts
+    are cached by a hash of the upload and of its PCM, so a re-sent file or
+    a re-encoded copy of the same audio skips recognition. Hits carry
+    ``X-Cached: true``.
+    """
+    upload = await _open_upload(request)
+    cache: object = request.app.state.cache
+    recognition: object = request.app.state.recognition
     try:
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            wav_path = f.name
-
-        proc = subprocess.run(
-            ["ffmpeg", "-y", "-i", "pipe:0",
-             "-ar", "16000", "-ac", "1", "-f", "wav", wav_path],
-            input=audio_bytes,
-            capture_output=True,
+        recognition.admit()
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Te veel verzoeken, probeer het later opnieuw",
+            headers={"Retry-After": str(exc.retry_after)},
         )
-        if proc.returncode != 0:
-            logger.error("ffmpeg error: %s", proc.stderr[-400:].decode(errors="replace"))
-            raise HTTPException(status_code=422, detail="Audio conversie mislukt")
-
-        duration = _get_duration(wav_path)
-        if duration > MAX_DURATION_SECS:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Audio te lang ({int(duration)}s, max {MAX_DURATION_SECS}s)",
+    try:
+        async with recognition.decoding():
+            with stage("decode"):
+                waveform = await _decode_upload(upload)
+        duration = len(waveform) / SAMPLE_RATE
+
+        with stage("cache_lookup"):
+            upload_key = cache.key("upload", upload.sha256())
+            cached = await cache.get(upload_key)
+        if cached is not None:
+            response.headers["X-Cached"] = "true"
+            return {"text": cached["text"]}
+
+        with stage("cache_lookup"):
+            pcm_key = cache.key("pcm", await asyncio.to_thread(_hash_pcm, waveform))
+            cached = await cache.get(pcm_key)
+        if cached is not None:
+            await cache.put(upload_key, cached)
+            response.headers["X-Cached"] = "true"
+            return {"text": cached["text"]}
+
+        t0 = time.perf_counter()
+        with stage("vad"):
+            bounds = await recognition.run(segment_speech, waveform)
+        with stage("recognize"):
+            texts = await request.app.state.batcher.recognize(
+                [waveform[start:end] for start, end in bounds]
             )
+        text = " ".join(t for t in texts if t)
+        observe_realtime(duration, time.perf_counter() - t0)
+        entry = {"text": text, "duration": round(duration, 2)}
+        await cache.put(upload_key, entry)
+        await cache.put(pcm_key, entry)
+    finally:
+        recognition.release()
+    logger.info("Transcriptie (%ds, VAD): %r", int(duration), text[:120])
+    return {"text": text}
+
+
+@router.get("/api/stt/cache/stats")
+async def cache_stats(request: Request) -> dict:
+    """Transcript cache hit statistics since startup."""
+    cache: object = request.app.state.cache
+    return cache.stats()
+
+
+def _job_status(job: object) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "duration": job.duration,
+        "segments_total": job.segments_total,
+        "segments_done": len(job.segments),
+        "progress": round(job.progress, 3),
+        "segments": job.segments,
+        "text": job.text,
+        "error": job.error,
+    }
 
-        segments = _vad_model.recognize(wav_path)
-        text = " ".join(seg.text for seg in segments)
-        logger.info("Transcriptie (%ds, VAD): %r", int(duration), text[:120])
-        return {"text": text}
 
+@router.post("/api/stt/jobs", status_code=202, openapi_extra=_UPLOAD_OPENAPI)
+async def submit_job(request: Request, response: Response):
+    """Queue a long recording (form field ``audio``) for transcription; poll
+    ``/api/stt/jobs/{id}``.
+
+    A recording whose transcript is cached, by upload or PCM hash like
+    ``/api/stt``, is not transcribed again: the job comes back finished,
+    with ``X-Cached: true``.
+    """
+    upload = await _open_upload(request)
+    jobs: object = request.app.state.jobs
+    cache: object = request.app.state.cache
+    if jobs.queued() >= settings.stt_job_max_queued:
+        raise HTTPException(
+            status_code=429,
+            detail="Te veel verzoeken, probeer het later opnieuw",
+            headers={"Retry-After": "60"},
+        )
+    recognition: object = request.app.state.recognition
+    async with recognition.decoding():
+        with stage("decode"):
+            waveform = await _decode_upload(upload)
+    with stage("cache_lookup"):
+        upload_key = cache.key("upload", upload.sha256())
+        cached = await cache.get(upload_key)
+    if cached is not None:
+        response.headers["X-Cached"] = "true"
+        return _job_status(await jobs.submit_cached(cached))
+    with stage("cache_lookup"):
+        pcm_key = cache.key("pcm", await asyncio.to_thread(_hash_pcm, waveform))
+        cached = await cache.get(pcm_key)
+    if cached is not None:
+        await cache.put(upload_key, cached)
+        response.headers["X-Cached"] = "true"
+        return _job_status(await jobs.submit_cached(cached))
+    job = await jobs.submit(waveform, cache_keys=[upload_key, pcm_key])
+    logger.info("STT job %s: %ds audio", job.id, int(job.duration))
+    return _job_status(job)
+
+
+@router.get("/api/stt/jobs/{job_id}")
+async def job_status(request: Request, job_id: str, wait: float = 0, since: int = 0):
+    """Job status with the segments recognized so far, in order, and the full
+    text once done. With ``wait`` (seconds, max 60) the call blocks until more
+    than ``since`` segments are done or the job finishes."""
+    jobs: object = request.app.state.jobs
+    job = await jobs.wait(job_id, min(max(wait, 0), _MAX_JOB_WAIT_SECONDS), since)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job niet gevonden")
+    return _job_status(job)
+
+
+async def _close_with_error(websocket: WebSocket, code: int, detail: str) -> None:
+    await websocket.send_json({"type": "error", "detail": detail})
+    await websocket.close(code=code)
+
+
+@router.websocket("/api/stt/stream")
+async def speech_to_text_stream(websocket: WebSocket):
+    """Transcribe live audio while it is being recorded.
+
+    The client sends binary frames of 16 kHz mono 16-bit little-endian PCM and
+    the text message ``end`` when recording stops. The server answers with
+    JSON messages: ``partial`` and ``final`` per speech segment (a final
+    replaces the partials with the same ``segment`` index), then ``done`` with
+    the full text, after which it closes the connection.
+    """
+    await websocket.accept()
+    if _asr_model is None:
+        await _close_with_error(websocket, 1013, "Model wordt nog geladen, probeer opnieuw")
+        return
+
+    recognition: object = websocket.app.state.recognition
+    try:
+        recognition.open_stream()
+    except QueueFullError:
+        await _close_with_error(websocket, 1013, "Te veel verzoeken, probeer het later opnieuw")
+        return
+    transcriber = StreamingTranscriber(
+        _vad,
+        websocket.app.state.batcher.recognize,
+        recognition.run,
+        step_ms=settings.stt_stream_step_ms,
+        silence_ms=settings.stt_stream_silence_ms,
+        partial_interval_ms=settings.stt_stream_partial_interval_ms,
+        max_segment_s=settings.stt_stream_max_segment_s,
+        vad_options=PROFILE.vad_options(),
+    )
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                if transcriber.duration > MAX_DURATION_SECS:
+                    await _close_with_error(
+                        websocket, 1009, f"Audio te lang (max {MAX_DURATION_SECS}s)"
+                    )
+                    return
+                replies = await transcriber.feed(message["bytes"])
+            elif message.get("text") == "end":
+                for reply in await transcriber.finish():
+                    await websocket.send_json(reply)
+                logger.info("Transcriptie (%ds, stream)", int(transcriber.duration))
+                await websocket.close()
+                return
+            else:
+                continue
+            for reply in replies:
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
     finally:
-        if wav_path:
-            Path(wav_path).unlink(missing_ok=True)
+        recognition.close_stream()
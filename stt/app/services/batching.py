@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+from app.metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# (arrival time, waveform, future for its text)
+_Pending = tuple[float, np.ndarray, asyncio.Future]
+
+
+class SegmentBatcher:
+    """Batches VAD speech segments from all in-flight requests for the recognizer.
+
+    Segments wait in length buckets (powers of two seconds), so a batch pads
+    each segment to at most twice its length. A batch is taken from the
+    bucket holding the oldest segment once it has ``max_batch`` segments or
+    that segment has waited ``window_ms``; it is also capped at
+    ``max_batch_seconds`` of audio. Up to ``concurrency`` batches run at once
+    through ``run``, which executes the blocking ``recognize_batch`` off the
+    event loop. Each caller gets its texts back in segment order. Closing
+    the batcher fails every segment still waiting or being recognized.
+    """
+
+    def __init__(
+        self,
+        recognize_batch: Callable[[list[np.ndarray]], list[str]],
+        run: Callable[..., Awaitable[list[str]]],
+        concurrency: int = 1,
+        window_ms: float = 20,
+        max_batch: int = 8,
+        max_batch_seconds: float = 240,
+    ) -> None:
+        self._recognize_batch = recognize_batch
+        self._run = run
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._window = window_ms / 1000
+        self._max_batch = max(1, max_batch)
+        self._max_samples = max_batch_seconds * SAMPLE_RATE
+        self._buckets: dict[int, deque[_Pending]] = {}
+        self._changed = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        # Batches being recognized, by their dispatch task
+        self._running: dict[asyncio.Task, list[_Pending]] = {}
+
+    async def recognize(self, segments: list[np.ndarray]) -> list[str]:
+        """Recognize the speech segments of one request, in order."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._loop())
+        loop = asyncio.get_running_loop()
+        futures = []
+        for segment in segments:
+            future = loop.create_future()
+            bucket = math.ceil(math.log2(max(len(segment), 1) / SAMPLE_RATE + 1))
+            self._buckets.setdefault(bucket, deque()).append((time.monotonic(), segment, future))
+            futures.append(future)
+        self._changed.set()
+        return list(await asyncio.gather(*futures))
+
+    def pending(self) -> int:
+        """Number of segments waiting for a batch."""
+        return sum(len(b) for b in self._buckets.values())
+
+    def close(self) -> None:
+        """Stop batching and fail every segment that has no text yet."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        error = RuntimeError("Segment batcher closed")
+        waiting = [p for bucket in self._buckets.values() for p in bucket]
+        waiting += [p for batch in self._running.values() for p in batch]
+        for _, _, future in waiting:
+            if not future.done():
+                future.set_exception(error)
+        self._buckets.clear()
+        for task in self._running:
+            task.cancel()
+
+    async def _loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._running[task] = batch
+            task.add_done_callback(lambda t: self._running.pop(t, None))
+
+    async def _collect(self) -> list[_Pending]:
+        while True:
+            self._changed.clear()
+            # Requests that gave up while waiting do not need inference
+            for key, bucket in list(self._buckets.items()):
+                live = deque(p for p in bucket if not p[2].done())
+                if live:
+                    self._buckets[key] = live
+                else:
+                    del self._buckets[key]
+            if not self._buckets:
+                await self._changed.wait()
+                continue
+
+            full = [b for b in self._buckets.values() if len(b) >= self._max_batch]
+            bucket = min(full or self._buckets.values(), key=lambda b: b[0][0])
+            timeout = bucket[0][0] + self._window - time.monotonic()
+            if len(bucket) < self._max_batch and timeout > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except TimeoutError:
+                    pass
+                continue
+
+            batch = [bucket.popleft()]
+            samples = len(batch[0][1])
+            while bucket and len(batch) < self._max_batch:
+                if samples + len(bucket[0][1]) > self._max_samples:
+                    break
+                samples += len(bucket[0][1])
+                batch.append(bucket.popleft())
+            return batch
+
+    async def _dispatch(self, batch: list[_Pending]) -> None:
+        try:
+            BATCH_SIZE.observe(len(batch))
+            logger.debug("Recognizing batch of %d segments", len(batch))
+            texts = await self._run(self._recognize_batch, [w for _, w, _ in batch])
+            if len(texts) != len(batch):
+                raise RuntimeError(f"Batch of {len(batch)} segments returned {len(texts)} texts")
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, _, future), text in zip(batch, texts, strict=True):
+                if not future.done():
+                    future.set_result(text)
+        finally:
+            self._slots.release()
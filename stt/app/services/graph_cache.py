@@ -0,0 +1,109 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+from pathlib import Path
+
+import onnxruntime as rt
+from onnx_asr.loader import create_asr_resolver, create_vad_resolver
+
+from app.services.profile import InferenceProfile
+
+logger = logging.getLogger(__name__)
+
+_MARKER = "fingerprint.json"
+
+
+def _cpu_model() -> str:
+    # Optimized graphs may use instructions of the CPU they were built on
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+class GraphCache:
+    """Optimized ONNX graphs of the models, kept across restarts.
+
+    On the first start every ONNX file of a model is optimized once at the
+    profile's graph optimization level and saved, next to copies of the
+    model's other files, in a directory named after a fingerprint of
+    everything the optimized graph depends on: model, quantization,
+    optimization level, execution providers, onnxruntime version and CPU.
+    Later starts load that directory with graph optimization off, which skips
+    both the model hub lookup and the optimization.
+    """
+
+    def __init__(self, root: str, profile: InferenceProfile) -> None:
+        self._root = Path(root)
+        self._profile = profile
+
+    def _fingerprint(self, kind: str, model: str, quantization: str) -> dict:
+        return {
+            "kind": kind,
+            "model": model,
+            "quantization": quantization,
+            "graph_optimization": self._profile.graph_optimization,
+            "providers": self._profile.execution_providers(),
+            "onnxruntime": rt.__version__,
+            "machine": platform.machine(),
+            "cpu": _cpu_model(),
+        }
+
+    def path(self, kind: str, model: str, quantization: str) -> Path:
+        fingerprint = self._fingerprint(kind, model, quantization)
+        digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+        return self._root / f"{model.replace('/', '--')}-{digest[:16]}"
+
+    def get(self, kind: str, model: str, quantization: str) -> Path | None:
+        """Directory of a complete earlier build, or None."""
+        path = self.path(kind, model, quantization)
+        return path if (path / _MARKER).is_file() else None
+
+    def discard(self, kind: str, model: str, quantization: str) -> None:
+        """Remove a build that failed to load, so the next start makes a new one."""
+        shutil.rmtree(self.path(kind, model, quantization), ignore_errors=True)
+
+    def resolve(self, kind: str, model: str, quantization: str) -> list[Path]:
+        """Files of the model, downloaded from the model hub when missing."""
+        resolver = (create_asr_resolver if kind == "asr" else create_vad_resolver)(model)
+        files = resolver.resolve_model(quantization=quantization or None)
+        return sorted(set(files.values()))
+
+    def build(self, kind: str, model: str, quantization: str, files: list[Path]) -> Path:
+        """Save optimized copies of the model's ONNX files; returns their directory."""
+        target = self.path(kind, model, quantization)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        try:
+            for source in files:
+                if source.suffix != ".onnx":
+                    shutil.copy2(source, tmp / source.name)
+                    continue
+                options = self._profile.session_options()
+                options.optimized_model_filepath = str(tmp / source.name)
+                # Weights go to a side file, so graphs over 2 GB can be saved too
+                options.add_session_config_entry(
+                    "session.optimized_model_external_initializers_file_name",
+                    f"{source.name}.data",
+                )
+                rt.InferenceSession(
+                    str(source), options, providers=self._profile.execution_providers()
+                )
+            (tmp / _MARKER).write_text(
+                json.dumps(self._fingerprint(kind, model, quantization), indent=2)
+            )
+            shutil.rmtree(target, ignore_errors=True)
+            tmp.rename(target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.info("Saved optimized graphs of %s to %s", model, target)
+        return target
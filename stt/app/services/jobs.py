@@ -0,0 +1,299 @@
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Progress of a running job is written to disk at most this often
+_SAVE_INTERVAL_SECONDS = 5.0
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = "queued"         # "queued" | "running" | "done" | "failed"
+    created_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    duration: float = 0.0          # seconds of audio
+    segments_total: int | None = None  # known once the VAD has run
+    segments: list[dict] = field(default_factory=list)  # recognized so far, by index
+    text: str | None = None
+    error: str | None = None
+    error_status: int | None = None
+    cache_keys: list[str] = field(default_factory=list)  # transcript cache entries to fill
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @property
+    def progress(self) -> float:
+        if self.status == "done":
+            return 1.0
+        if not self.segments_total:
+            return 0.0
+        return len(self.segments) / self.segments_total
+
+
+class JobQueue:
+    """Persistent transcription jobs for long recordings.
+
+    A job's decoded audio is stored as float32 PCM next to its JSON under
+    ``jobs_dir``. A worker splits it at VAD boundaries and recognizes up to
+    ``segments_in_flight`` segments at once through ``recognize`` (the
+    cross-request batcher), so a long recording fills batches on every
+    recognition worker while interactive requests still get their turn.
+    Segments are stored in order as they finish. On startup unfinished jobs
+    are queued again and resume after their last stored segment. A finished
+    transcript is passed to ``store`` under each of the job's cache keys.
+    """
+
+    def __init__(
+        self,
+        segment: Callable[[np.ndarray], list[tuple[int, int]]],
+        recognize: Callable[[list[np.ndarray]], Awaitable[list[str]]],
+        run: Callable[..., Awaitable],
+        jobs_dir: str,
+        workers: int = 1,
+        segments_in_flight: int = 16,
+        retention_hours: float = 24,
+        store: Callable[[str, dict], Awaitable[None]] | None = None,
+    ) -> None:
+        self._segment = segment
+        self._store = store
+        self._recognize = recognize
+        self._run = run
+        self._root = Path(jobs_dir)
+        self._workers = max(1, workers)
+        self._in_flight = max(1, segments_in_flight)
+        self._retention_seconds = retention_hours * 3600
+        self._jobs: dict[str, Job] = {}
+        self._events: dict[str, asyncio.Event] = {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Load persisted jobs and requeue unfinished ones."""
+        jobs = await asyncio.to_thread(self._load_all)
+        for job in sorted(jobs, key=lambda j: j.created_at):
+            self._jobs[job.id] = job
+            self._events[job.id] = asyncio.Event()
+            if job.finished:
+                continue
+            if not self._audio_path(job.id).exists():
+                job.status, job.error, job.error_status = "failed", "Audio van job ontbreekt", 500
+                job.finished_at = time.time()
+                await self._save(job)
+                continue
+            job.status = "queued"
+            self._queue.put_nowait(job.id)
+        if self._queue.qsize():
+            logger.info("Requeued %d unfinished STT jobs", self._queue.qsize())
+        await self._prune()
+
+    def start_workers(self) -> None:
+        """Start transcribing; call once the models are loaded."""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == "queued")
+
+    async def submit(self, waveform: np.ndarray, cache_keys: list[str] | None = None) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex,
+            created_at=time.time(),
+            duration=round(len(waveform) / SAMPLE_RATE, 2),
+            cache_keys=cache_keys or [],
+        )
+        await asyncio.to_thread(self._write_audio, job.id, waveform)
+        self._jobs[job.id] = job
+        self._events[job.id] = asyncio.Event()
+        await self._save(job)
+        self._queue.put_nowait(job.id)
+        await self._prune()
+        return job
+
+    async def submit_cached(self, entry: dict) -> Job:
+        """Record an already finished job for a cached transcript."""
+        now = time.time()
+        segments = entry.get("segments", [])
+        job = Job(
+            id=uuid.uuid4().hex,
+            status="done",
+            created_at=now,
+            started_at=now,
+            finished_at=now,
+            duration=entry.get("duration", 0.0),
+            segments_total=len(segments),
+            segments=segments,
+            text=entry["text"],
+        )
+        self._jobs[job.id] = job
+        self._events[job.id] = asyncio.Event()
+        await self._save(job)
+        await self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float, since: int = 0) -> Job | None:
+        """Return the job once more than ``since`` segments are done, it is
+        finished or ``timeout`` seconds have passed."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or timeout <= 0 or len(job.segments) > since:
+            return job
+        try:
+            await asyncio.wait_for(self._events[job_id].wait(), timeout)
+        except TimeoutError:
+            pass
+        return job
+
+    def _notify(self, job: Job) -> None:
+        # Wake current waiters; later ones wait for the next change
+        self._events[job.id].set()
+        self._events[job.id] = asyncio.Event()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.status, job.started_at = "running", time.time()
+            await self._save(job)
+            self._notify(job)
+            try:
+                await self._transcribe(job)
+                job.status = "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("STT job %s failed", job.id)
+                job.status, job.error, job.error_status = "failed", "Transcriptie mislukt", 500
+            job.finished_at = time.time()
+            await self._save(job)
+            await asyncio.to_thread(self._audio_path(job.id).unlink, missing_ok=True)
+            self._notify(job)
+            if job.status == "done":
+                await self._cache_transcript(job)
+
+    async def _cache_transcript(self, job: Job) -> None:
+        if self._store is None:
+            return
+        entry = {"text": job.text, "duration": job.duration, "segments": job.segments}
+        try:
+            for key in job.cache_keys:
+                await self._store(key, entry)
+        except OSError:
+            logger.warning("Caching the transcript of STT job %s failed", job.id)
+
+    async def _transcribe(self, job: Job) -> None:
+        waveform = await asyncio.to_thread(
+            np.fromfile, self._audio_path(job.id), dtype=np.float32
+        )
+        bounds = await self._run(self._segment, waveform)
+        job.segments_total = len(bounds)
+        done = {s["index"] for s in job.segments}
+        slots = asyncio.Semaphore(self._in_flight)
+        saved_at = time.monotonic()
+
+        async def one(index: int) -> None:
+            nonlocal saved_at
+            start, end = bounds[index]
+            async with slots:
+                [text] = await self._recognize([waveform[start:end]])
+            bisect.insort(
+                job.segments,
+                {
+                    "index": index,
+                    "start": round(start / SAMPLE_RATE, 2),
+                    "end": round(end / SAMPLE_RATE, 2),
+                    "text": text,
+                },
+                key=lambda s: s["index"],
+            )
+            self._notify(job)
+            if time.monotonic() - saved_at >= _SAVE_INTERVAL_SECONDS:
+                saved_at = time.monotonic()
+                await self._save(job)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for index in range(len(bounds)):
+                    if index not in done:
+                        group.create_task(one(index))
+        except ExceptionGroup as exc:
+            raise exc.exceptions[0]
+        job.text = " ".join(s["text"] for s in job.segments if s["text"])
+
+    async def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self._retention_seconds
+        expired = [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+            del self._events[job_id]
+        if expired:
+            await asyncio.to_thread(self._delete, expired)
+
+    def _path(self, job_id: str) -> Path:
+        return self._root / f"{job_id}.json"
+
+    def _audio_path(self, job_id: str) -> Path:
+        return self._root / f"{job_id}.f32"
+
+    async def _save(self, job: Job) -> None:
+        # Serialize on the event loop: running segment tasks keep inserting into
+        # job.segments, so a snapshot taken in the thread could skip or repeat one
+        data = json.dumps(asdict(job))
+        await asyncio.to_thread(self._write, job.id, data)
+
+    def _write(self, job_id: str, data: str) -> None:
+        self._root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job_id)
+        # Write-then-rename so a crash never leaves a truncated job file
+        tmp = path.with_name(f"{job_id}.{os.getpid()}.tmp")
+        tmp.write_text(data)
+        tmp.replace(path)
+
+    def _write_audio(self, job_id: str, waveform: np.ndarray) -> None:
+        self._root.mkdir(parents=True, exist_ok=True)
+        path = self._audio_path(job_id)
+        tmp = path.with_name(f"{job_id}.{os.getpid()}.f32.tmp")
+        waveform.astype(np.float32, copy=False).tofile(tmp)
+        tmp.replace(path)
+
+    def _delete(self, job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            self._path(job_id).unlink(missing_ok=True)
+            self._audio_path(job_id).unlink(missing_ok=True)
+
+    def _load_all(self) -> list[Job]:
+        if not self._root.is_dir():
+            return []
+        jobs = []
+        for path in self._root.glob("*.json"):
+            try:
+                jobs.append(Job(**json.loads(path.read_text())))
+            except (OSError, ValueError, TypeError):
+                logger.warning("Skipping unreadable job file %s", path.name)
+        return jobs
@@ -0,0 +1,97 @@
+from dataclasses import asdict, dataclass
+
+import onnxruntime as rt
+
+_GRAPH_OPTIMIZATION = {
+    "disable": rt.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": rt.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": rt.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": rt.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    """How the ASR model and the Silero VAD are loaded and run."""
+
+    model: str = "nemo-parakeet-tdt-0.6b-v3"
+    quantization: str = ""             # "" = full precision | "int8"
+    providers: tuple[str, ...] = ()    # onnxruntime execution providers; empty = all available
+    intra_op_threads: int = 0          # threads within one operator; 0 = one per core
+    inter_op_threads: int = 0          # operators run in parallel; 0 = sequential
+    graph_optimization: str = "all"    # "disable" | "basic" | "extended" | "all"
+    vad_threshold: float = 0.5
+    vad_min_silence_ms: int = 100
+    vad_speech_pad_ms: int = 30
+    vad_max_speech_s: float = 180
+
+    def __post_init__(self) -> None:
+        if self.graph_optimization not in _GRAPH_OPTIMIZATION:
+            raise ValueError(f"graph_optimization must be one of {set(_GRAPH_OPTIMIZATION)}")
+
+    @classmethod
+    def from_settings(cls, settings: object) -> "InferenceProfile":
+        return cls(
+            model=settings.stt_model,
+            quantization=settings.stt_quantization,
+            providers=tuple(p.strip() for p in settings.stt_providers.split(",") if p.strip()),
+            intra_op_threads=settings.stt_intra_op_threads,
+            inter_op_threads=settings.stt_inter_op_threads,
+            graph_optimization=settings.stt_graph_optimization,
+            vad_threshold=settings.stt_vad_threshold,
+            vad_min_silence_ms=settings.stt_vad_min_silence_ms,
+            vad_speech_pad_ms=settings.stt_vad_speech_pad_ms,
+            vad_max_speech_s=settings.stt_vad_max_speech_s,
+        )
+
+    @property
+    def id(self) -> str:
+        """Everything in the profile that can change a transcript."""
+        return (
+            f"{self.model}:{self.quantization or 'fp32'}"
+            f"+silero:{self.vad_threshold}/{self.vad_min_silence_ms}"
+            f"/{self.vad_speech_pad_ms}/{self.vad_max_speech_s}"
+        )
+
+    def describe(self) -> dict:
+        return asdict(self)
+
+    def execution_providers(self) -> list[str]:
+        """The configured providers, or every available one as onnx-asr picks them."""
+        if self.providers:
+            return list(self.providers)
+        return [p for p in rt.get_available_providers() if p != "AzureExecutionProvider"]
+
+    def session_options(self) -> rt.SessionOptions:
+        options = rt.SessionOptions()
+        options.graph_optimization_level = _GRAPH_OPTIMIZATION[self.graph_optimization]
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        if self.inter_op_threads:
+            options.inter_op_num_threads = self.inter_op_threads
+            options.execution_mode = rt.ExecutionMode.ORT_PARALLEL
+        return options
+
+    def model_kwargs(self) -> dict:
+        """Keyword arguments for ``onnx_asr.load_model``."""
+        return {
+            "quantization": self.quantization or None,
+            "sess_options": self.session_options(),
+            "providers": list(self.providers) or None,
+        }
+
+    def vad_kwargs(self) -> dict:
+        """Keyword arguments for ``onnx_asr.load_vad``."""
+        return {
+            "sess_options": self.session_options(),
+            "providers": list(self.providers) or None,
+        }
+
+    def vad_options(self) -> dict:
+        """Segmentation options for the VAD's ``segment_batch``."""
+        return {
+            "threshold": self.vad_threshold,
+            "min_silence_duration_ms": self.vad_min_silence_ms,
+            "speech_pad_ms": self.vad_speech_pad_ms,
+            "max_speech_duration_s": self.vad_max_speech_s,
+        }
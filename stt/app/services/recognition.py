@@ -0,0 +1,117 @@
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from app.metrics import QUEUE_REJECTED, QUEUE_WAIT_SECONDS
+
+R = TypeVar("R")
+
+# Weight of the newest recognition in the running average duration
+_EWMA_ALPHA = 0.2
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"recognition queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RecognitionPool:
+    """Runs blocking recognitions on a dedicated thread pool with bounded admission.
+
+    At most ``workers`` recognitions run at once and ``max_queue`` admitted
+    requests may wait (decoding or queued for a worker). Beyond that
+    ``admit`` raises QueueFullError straight away, with a Retry-After
+    estimate based on the average recognition time. ffmpeg decodes are
+    limited separately to ``decode_workers``, and live streaming sessions,
+    which share the recognition threads, to ``max_streams``.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_queue: int = 4,
+        decode_workers: int = 2,
+        max_streams: int = 4,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._capacity = self._workers + max(0, max_queue)
+        self._executor = ThreadPoolExecutor(self._workers, thread_name_prefix="stt-recognize")
+        self._slots = asyncio.Semaphore(self._workers)
+        self._decode_slots = asyncio.Semaphore(max(1, decode_workers))
+        self._max_streams = max(0, max_streams)
+        self._admitted = 0
+        self._running = 0
+        self._streams = 0
+        self._avg_seconds = 0.0
+
+    def waiting(self) -> int:
+        """Admitted requests that are not recognizing yet."""
+        return self._admitted - self._running
+
+    def running(self) -> int:
+        return self._running
+
+    def streams(self) -> int:
+        return self._streams
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free."""
+        return max(1, math.ceil(self._avg_seconds * (self.waiting() + 1) / self._workers))
+
+    def admit(self) -> None:
+        """Take a place in the queue for the whole request, or raise QueueFullError.
+
+        Every successful call must be paired with ``release``.
+        """
+        if self._admitted >= self._capacity:
+            QUEUE_REJECTED.inc()
+            raise QueueFullError(self.retry_after())
+        self._admitted += 1
+
+    def release(self) -> None:
+        self._admitted -= 1
+
+    def open_stream(self) -> None:
+        """Take a streaming session slot, or raise QueueFullError.
+
+        Every successful call must be paired with ``close_stream``.
+        """
+        if self._streams >= self._max_streams:
+            QUEUE_REJECTED.inc()
+            raise QueueFullError(self.retry_after())
+        self._streams += 1
+
+    def close_stream(self) -> None:
+        self._streams -= 1
+
+    @asynccontextmanager
+    async def decoding(self) -> AsyncIterator[None]:
+        async with self._decode_slots:
+            yield
+
+    async def run(self, fn: Callable[..., R], *args: object) -> R:
+        """Run ``fn(*args)`` on a recognition thread once one is free."""
+        t0 = time.perf_counter()
+        async with self._slots:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - t0)
+            self._running += 1
+            started = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, fn, *args
+                )
+            finally:
+                self._running -= 1
+                elapsed = time.perf_counter() - started
+                if self._avg_seconds:
+                    self._avg_seconds += _EWMA_ALPHA * (elapsed - self._avg_seconds)
+                else:
+                    self._avg_seconds = elapsed
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,45 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class LoadState:
+    """Progress of model loading at startup, for the health endpoints."""
+
+    def __init__(self) -> None:
+        self.status = "loading"            # "loading" | "ready" | "failed"
+        self.current: str | None = None    # phase in progress
+        self.phases: dict[str, float] = {}  # seconds per finished phase
+        self.graph_cache: dict[str, str] = {}  # per model: "hit" | "miss" | "error"
+        self.error: str | None = None
+        self._started = time.perf_counter()
+        self._total: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.current = name
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - t0, 3)
+            self.current = None
+
+    def finish(self, error: str | None = None) -> None:
+        self.status = "failed" if error else "ready"
+        self.error = error
+        self._total = round(time.perf_counter() - self._started, 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "phase": self.current,
+            "phases": self.phases,
+            "graph_cache": self.graph_cache,
+            "elapsed_s": self._total or round(time.perf_counter() - self._started, 3),
+            "error": self.error,
+        }
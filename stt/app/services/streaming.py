@@ -0,0 +1,189 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import numpy as np
+
+from app.metrics import observe_realtime, stage
+
+SAMPLE_RATE = 16000
+_HOP = 512       # samples per Silero frame at 16 kHz
+_CONTEXT = 64    # trailing samples of the previous frame the model also sees
+
+
+class StreamingTranscriber:
+    """Incremental transcription of a live 16 kHz mono audio stream.
+
+    Audio is buffered from the end of the last finished segment. Every
+    ``step_ms`` of new audio the Silero VAD runs over just that new audio,
+    carrying its recurrent state and keeping the speech probabilities of the
+    buffer, from which the segments are found. A speech segment followed by
+    ``silence_ms`` of silence is finished, recognized and reported as
+    ``final``, and the buffer is cut after it. The segment still being
+    spoken is recognized at most every ``partial_interval_ms`` and reported
+    as ``partial`` with the index its final result will get.
+
+    The VAD is onnx_asr's Silero VAD, driven frame by frame through its
+    session and segment merging, exactly as its ``segment_batch`` does for
+    a whole recording. ``run`` executes the blocking VAD off the event loop;
+    ``recognize`` turns a list of segments into their texts.
+    """
+
+    def __init__(
+        self,
+        vad: Any,
+        recognize: Callable[[list[np.ndarray]], Awaitable[list[str]]],
+        run: Callable[..., Awaitable[Any]],
+        step_ms: int = 500,
+        silence_ms: int = 600,
+        partial_interval_ms: int = 1000,
+        max_segment_s: float = 20,
+        vad_options: dict | None = None,
+    ) -> None:
+        self._vad = vad
+        self._recognize = recognize
+        self._run = run
+        self._step = step_ms * SAMPLE_RATE // 1000
+        self._silence = silence_ms * SAMPLE_RATE // 1000
+        self._partial_interval = partial_interval_ms / 1000
+        self._vad_options = {
+            **(vad_options or {}),
+            "min_silence_duration_ms": silence_ms,
+            "max_speech_duration_s": max_segment_s,
+        }
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._frames: list[np.ndarray] = []  # received since the last step
+        self._offset = 0           # stream position of buffer[0], in samples
+        self._unprocessed = 0      # samples received since the last VAD pass
+        self._vad_pos = 0          # stream position the VAD has run up to
+        self._vad_state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._vad_context = np.zeros(_CONTEXT, dtype=np.float32)
+        self._probs: list[float] = []  # speech probability per frame, from _probs_start
+        self._probs_start = 0      # stream frame index of _probs[0]
+        self._leftover = b""       # odd trailing byte of the last frame
+        self._index = 0            # index of the next final segment
+        self._last_partial = 0.0
+        self._texts: list[str] = []
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio received so far."""
+        return (self._offset + len(self._buffer) + self._unprocessed) / SAMPLE_RATE
+
+    async def feed(self, data: bytes) -> list[dict]:
+        """Add 16-bit little-endian PCM; returns the messages for the client."""
+        data = self._leftover + data
+        usable = len(data) - len(data) % 2
+        self._leftover = data[usable:]
+        pcm = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768
+        self._frames.append(pcm)
+        self._unprocessed += len(pcm)
+        if self._unprocessed < self._step:
+            return []
+        self._take_frames()
+        return await self._process(final=False)
+
+    async def finish(self) -> list[dict]:
+        """Finish every remaining segment and end with a ``done`` message."""
+        self._take_frames()
+        messages = await self._process(final=True) if len(self._buffer) else []
+        messages.append({
+            "type": "done",
+            "text": " ".join(t for t in self._texts if t),
+            "duration": round(self.duration, 2),
+        })
+        return messages
+
+    async def _process(self, final: bool) -> list[dict]:
+        buffer = self._buffer
+        with stage("stream_vad"):
+            segments = await self._run(self._segment, final)
+
+        closed = [(a, b) for a, b in segments if final or len(buffer) - b >= self._silence]
+        open_ = segments[len(closed)] if len(closed) < len(segments) else None
+        want_partial = (
+            open_ is not None
+            and self._partial_interval > 0
+            and time.monotonic() - self._last_partial >= self._partial_interval
+        )
+        batch = closed + ([open_] if want_partial else [])
+        if not batch:
+            if open_ is None:
+                # Only silence: keep a little context for a word that is just starting
+                self._cut(max(0, len(buffer) - self._silence))
+            return []
+
+        t0 = time.perf_counter()
+        with stage("stream_recognize"):
+            texts = await self._recognize([buffer[a:b] for a, b in batch])
+        observe_realtime(sum(b - a for a, b in batch) / SAMPLE_RATE, time.perf_counter() - t0)
+
+        messages = []
+        for (a, b), text in zip(closed, texts):
+            messages.append(self._message("final", self._index, a, b, text))
+            self._texts.append(text)
+            self._index += 1
+        if want_partial:
+            a, b = open_
+            messages.append(self._message("partial", self._index, a, b, texts[-1]))
+            self._last_partial = time.monotonic()
+        if closed:
+            self._cut(closed[-1][1])
+        return messages
+
+    def _take_frames(self) -> None:
+        """Append the frames received since the last step to the buffer."""
+        if self._frames:
+            self._buffer = np.concatenate([self._buffer, *self._frames])
+            self._frames = []
+        self._unprocessed = 0
+
+    def _segment(self, final: bool) -> list[tuple[int, int]]:
+        """Run the VAD over the audio it has not seen; returns the buffer's segments.
+
+        Without ``final`` a trailing part frame waits for the next step.
+        """
+        end = self._offset + len(self._buffer)
+        while self._vad_pos + _HOP <= end:
+            start = self._vad_pos - self._offset
+            self._vad_frame(self._buffer[start:start + _HOP])
+        if final and self._vad_pos < end:
+            tail = self._buffer[self._vad_pos - self._offset:]
+            self._vad_frame(np.pad(tail, (0, _HOP - len(tail))))
+        # Probabilities start at a frame boundary, at most one frame before the buffer
+        base = self._probs_start * _HOP
+        segments = self._vad._merge_segments(
+            self._vad._find_segments(self._probs, _HOP, **self._vad_options),
+            min(len(self._probs) * _HOP, end - base),
+            SAMPLE_RATE,
+            **self._vad_options,
+        )
+        shift = self._offset - base
+        return [(max(int(a) - shift, 0), int(b) - shift) for a, b in segments if b > shift]
+
+    def _vad_frame(self, chunk: np.ndarray) -> None:
+        frame = np.concatenate([self._vad_context, chunk])[None, :]
+        output, self._vad_state = self._vad._model.run(
+            ["output", "stateN"],
+            {"input": frame, "state": self._vad_state, "sr": np.array([SAMPLE_RATE])},
+        )
+        self._probs.append(output[0, 0])
+        self._vad_context = chunk[-_CONTEXT:]
+        self._vad_pos += _HOP
+
+    def _cut(self, samples: int) -> None:
+        self._buffer = self._buffer[samples:]
+        self._offset += samples
+        # Probabilities before the buffer are no longer needed
+        drop = self._offset // _HOP - self._probs_start
+        del self._probs[:drop]
+        self._probs_start += drop
+
+    def _message(self, kind: str, index: int, start: int, end: int, text: str) -> dict:
+        return {
+            "type": kind,
+            "segment": index,
+            "start": round((self._offset + start) / SAMPLE_RATE, 2),
+            "end": round((self._offset + end) / SAMPLE_RATE, 2),
+            "text": text,
+        }
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """Disk cache of transcripts, addressed by a content hash and the model ID.
+
+    Each entry is a small JSON file. An in-memory index keeps the entries in
+    least-recently-used order, so the cache evicts the coldest entries once
+    it holds more than ``max_bytes``; entries also expire after
+    ``ttl_days``. Disk access runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_id: str,
+        ttl_days: int = 30,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self._root = Path(cache_dir)
+        self._model_id = model_id
+        self._ttl_seconds = ttl_days * 86400
+        self._max_bytes = max_bytes
+        # key -> (file size, stored at), least recently used first
+        self._index: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._used = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._index), "bytes": self._used}
+
+    def key(self, kind: str, content_hash: str) -> str:
+        """Addressable cache key for hashed content: ``<sha256>.<kind>``.
+
+        ``kind`` names what was hashed, e.g. ``upload`` or ``pcm``.
+        """
+        payload = f"{self._model_id}:{content_hash}"
+        return f"{hashlib.sha256(payload.encode()).hexdigest()}.{kind}"
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    async def load(self) -> None:
+        """Index the entries already on disk, oldest first."""
+        entries = await asyncio.to_thread(self._scan)
+        for key, size, stored_at in sorted(entries, key=lambda e: e[2]):
+            self._index[key] = (size, stored_at)
+            self._used += size
+        if entries:
+            logger.info("Transcript cache: %d entries, %d bytes", len(entries), self._used)
+        await self._evict()
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._index.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        if time.time() - entry[1] > self._ttl_seconds:
+            self._stats["expired"] += 1
+            await self._drop([key])
+            return None
+        value = await asyncio.to_thread(self._read, key)
+        if value is None:
+            self._stats["misses"] += 1
+            await self._drop([key])
+            return None
+        self._index.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+
+    async def put(self, key: str, value: dict) -> None:
+        data = json.dumps(value).encode()
+        await asyncio.to_thread(self._write, key, data)
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._used -= old[0]
+        self._index[key] = (len(data), time.time())
+        self._used += len(data)
+        await self._evict()
+
+    async def _evict(self) -> None:
+        evicted = []
+        while self._used > self._max_bytes and self._index:
+            key, (size, _) = self._index.popitem(last=False)
+            self._used -= size
+            evicted.append(key)
+        if evicted:
+            self._stats["evictions"] += len(evicted)
+            await asyncio.to_thread(self._delete, evicted)
+
+    async def _drop(self, keys: list[str]) -> None:
+        for key in keys:
+            entry = self._index.pop(key, None)
+            if entry is not None:
+                self._used -= entry[0]
+        await asyncio.to_thread(self._delete, keys)
+
+    def _scan(self) -> list[tuple[str, int, float]]:
+        if not self._root.is_dir():
+            return []
+        entries = []
+        for path in self._root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path.name.removesuffix(".json"), stat.st_size, stat.st_mtime))
+        return entries
+
+    def _read(self, key: str) -> dict | None:
+        try:
+            return json.loads(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp = path.with_name(f"{key}.{os.getpid()}.{id(data)}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def _delete(self, keys: list[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
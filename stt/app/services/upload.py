@@ -0,0 +1,123 @@
+import hashlib
+from collections.abc import AsyncIterator
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class MultipartUpload:
+    """One file field of a multipart/form-data body, read while it arrives.
+
+    ``body`` yields the raw request body. It is parsed incrementally and
+    only as fast as ``read`` is called, so the file is never spooled to disk
+    or held in memory; other fields are skipped. The SHA-256 of the file is
+    computed on the way. More than ``max_bytes`` of file data raises
+    UploadError 413, with or without a Content-Length.
+    """
+
+    def __init__(
+        self, content_type: str, body: AsyncIterator[bytes], field: str, max_bytes: int
+    ) -> None:
+        kind, options = parse_options_header(content_type)
+        if kind != b"multipart/form-data" or b"boundary" not in options:
+            raise UploadError(400, "Verwacht multipart/form-data")
+        self._body = body
+        self._field = field.encode()
+        self._max_bytes = max_bytes
+        self._digest = hashlib.sha256()
+        self._state = "before"       # "before" | "file" | "done": where the file field is
+        self._in_field = False       # the part being parsed is the file field
+        self._headers: dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._data: list[bytes] = []
+        self.content_type = "application/octet-stream"
+        self.received = 0
+        self._parser = MultipartParser(
+            options[b"boundary"],
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    async def open(self) -> None:
+        """Read up to the start of the file; raises UploadError if it is missing."""
+        while self._state == "before":
+            if not await self._feed():
+                raise UploadError(422, f"Veld '{self._field.decode()}' ontbreekt")
+
+    async def read(self) -> bytes:
+        """The next part of the file; empty once it has been read completely."""
+        while not self._data and self._state == "file" and self.received <= self._max_bytes:
+            if not await self._feed():
+                raise UploadError(400, "Upload onvolledig ontvangen")
+        if self.received > self._max_bytes:
+            raise UploadError(413, "Audiobestand te groot (max 200 MB)")
+        chunk = b"".join(self._data)
+        self._data.clear()
+        return chunk
+
+    def sha256(self) -> str:
+        """Hash of the file bytes read so far; complete once ``read`` returns empty."""
+        return self._digest.hexdigest()
+
+    async def _feed(self) -> bool:
+        """Parse the next piece of the body; False once the body has ended."""
+        chunk = await anext(self._body, b"")
+        try:
+            if not chunk:
+                self._parser.finalize()
+                return False
+            self._parser.write(chunk)
+        except MultipartParseError as exc:
+            raise UploadError(400, "Ongeldige multipart-body") from exc
+        return True
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name, self._header_value = b"", b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._in_field = self._state == "before" and options.get(b"name") == self._field
+        if self._in_field:
+            self._state = "file"
+            content_type = self._headers.get(b"content-type")
+            if content_type:
+                self.content_type = content_type.decode("latin-1")
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._in_field:
+            return
+        chunk = data[start:end]
+        self.received += len(chunk)
+        if self.received <= self._max_bytes:
+            self._digest.update(chunk)
+            self._data.append(chunk)
+
+    def _on_part_end(self) -> None:
+        if self._in_field:
+            self._in_field = False
+            self._state = "done"
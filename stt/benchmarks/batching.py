@@ -0,0 +1,117 @@
+"""Benchmark: cross-request segment batching throughput against concurrency and batch size.
+
+Each simulated request submits a few VAD speech segments of random length
+to a SegmentBatcher. By default the recognizer is a CPU stub whose forward
+pass costs a fixed overhead plus a cost per padded audio second; with
+--onnx the real onnx-asr model runs on the ONNX CPU provider (downloaded on
+first use). Run from the stt directory:
+
+    python -m benchmarks.batching --requests 64 --concurrency 1,4,16 --max-batch 1,4,8
+    python -m benchmarks.batching --onnx nemo-parakeet-tdt-0.6b-v3 --requests 16
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.services.batching import SegmentBatcher
+from app.services.recognition import RecognitionPool
+from benchmarks.stubs import SAMPLE_RATE, StubAsr
+
+
+async def _run(
+    batcher: SegmentBatcher, workload: list[list[np.ndarray]], concurrency: int
+) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(segments: list[np.ndarray]) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await batcher.recognize(segments)
+            latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(segments) for segments in workload))
+    wall = time.perf_counter() - t_start
+    audio = sum(len(s) for segments in workload for s in segments) / SAMPLE_RATE
+    latencies.sort()
+    return {
+        "requests_per_s": len(workload) / wall,
+        "audio_per_s": audio / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", default="1,4,16", help="concurrent requests to sweep")
+    parser.add_argument("--max-batch", default="1,4,8", help="batch sizes to sweep")
+    parser.add_argument("--segments", type=int, default=3, help="speech segments per request")
+    parser.add_argument(
+        "--segment-seconds", default="2,20", help="min,max length of a speech segment"
+    )
+    parser.add_argument("--window-ms", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="concurrent recognitions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--batch-cost", type=float, default=0.1, help="stub seconds per forward pass"
+    )
+    parser.add_argument(
+        "--asr-cost", type=float, default=0.01, help="stub seconds per padded audio second"
+    )
+    parser.add_argument("--onnx", metavar="MODEL", help="use this onnx-asr model on the CPU")
+    args = parser.parse_args()
+
+    if args.onnx:
+        import onnx_asr
+
+        model = onnx_asr.load_model(args.onnx, providers=["CPUExecutionProvider"])
+    else:
+        model = StubAsr(args.asr_cost, args.batch_cost)
+
+    def recognize_batch(waveforms: list[np.ndarray]) -> list[str]:
+        return model.recognize(waveforms, sample_rate=SAMPLE_RATE)
+
+    rng = random.Random(args.seed)
+    noise = np.random.default_rng(args.seed)
+    low, high = (float(n) for n in args.segment_seconds.split(","))
+    workload = [
+        [
+            (noise.standard_normal(int(rng.uniform(low, high) * SAMPLE_RATE)) * 0.01)
+            .astype(np.float32)
+            for _ in range(args.segments)
+        ]
+        for _ in range(args.requests)
+    ]
+
+    for max_batch in (int(n) for n in args.max_batch.split(",")):
+        for concurrency in (int(n) for n in args.concurrency.split(",")):
+            pool = RecognitionPool(args.workers)
+            batcher = SegmentBatcher(
+                recognize_batch,
+                pool.run,
+                concurrency=args.workers,
+                window_ms=args.window_ms,
+                max_batch=max_batch,
+            )
+            try:
+                stats = await _run(batcher, workload, concurrency)
+            finally:
+                batcher.close()
+                pool.close()
+            print(
+                f"batch {max_batch:3d}  concurrency {concurrency:3d}: "
+                f"{stats['requests_per_s']:6.2f} req/s  {stats['audio_per_s']:7.1f} audio s/s  "
+                f"p50 {stats['p50_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms"
+            )
+    print(f"({args.requests} requests of {args.segments} segments, {args.workers} worker(s))")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""Benchmark: end-to-end load test of POST /api/stt.
+
+By default the FastAPI app runs in-process with a stub ASR model, so it needs
+no model download or GPU (ffmpeg must be installed); with --url it drives a
+running service instead. Results are printed as JSON; --baseline compares
+them with an earlier run and exits with status 1 on a regression. Needs
+benchmarks/requirements.txt installed. Run from the stt directory:
+
+    python -m benchmarks.load --requests 50 --concurrency 4 --audio-seconds 5,30,120
+    python -m benchmarks.load --output after.json --baseline before.json
+    python -m benchmarks.load --url http://localhost:8001
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+
+import app.routers.stt as stt_router
+from app.metrics import MetricsMiddleware
+from app.services.batching import SegmentBatcher
+from app.services.recognition import RecognitionPool
+from app.services.transcript_cache import TranscriptCache
+from benchmarks.harness import emit, run_load, summarize
+from benchmarks.stubs import StubAsr, StubVad, make_wav
+
+
+def _build_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(stt_router.router)
+    app.state.recognition = RecognitionPool(args.workers, args.max_queue, args.decode_workers)
+    app.state.batcher = SegmentBatcher(
+        stt_router.recognize_batch,
+        app.state.recognition.run,
+        concurrency=args.workers,
+        max_batch=args.max_batch,
+    )
+    app.state.cache = TranscriptCache(tempfile.mkdtemp(prefix="stt-bench-"), "stub")
+    stt_router._asr_model = StubAsr(args.asr_cost, args.batch_cost)
+    stt_router._vad = StubVad()
+    return app
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="benchmark a running service instead of the stub")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--audio-seconds", default="5,30,120",
+        help="comma-separated audio lengths, each request picks one at random",
+    )
+    parser.add_argument(
+        "--repeat-ratio", type=float, default=0.0,
+        help="fraction of requests that upload a file sent before",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--asr-cost", type=float, default=0.02,
+        help="stub compute seconds per audio second",
+    )
+    parser.add_argument(
+        "--batch-cost", type=float, default=0.0, help="stub compute seconds per forward pass"
+    )
+    parser.add_argument("--max-batch", type=int, default=8, help="speech segments per batch")
+    parser.add_argument("--workers", type=int, default=1, help="concurrent recognitions")
+    parser.add_argument("--max-queue", type=int, default=4, help="requests allowed to wait")
+    parser.add_argument("--decode-workers", type=int, default=2, help="concurrent decodes")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="allowed relative regression vs. baseline"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    noise = np.random.default_rng(args.seed)
+    lengths = [float(n) for n in args.audio_seconds.split(",")]
+    workload: list[tuple[bytes, float]] = []
+    for _ in range(args.requests):
+        if workload and rng.random() < args.repeat_ratio:
+            workload.append(rng.choice(workload))
+        else:
+            seconds = rng.choice(lengths)
+            workload.append((make_wav(seconds, noise), seconds))
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=600)
+    else:
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=_build_app(args)),
+            base_url="http://bench",
+            timeout=600,
+        )
+
+    async def call(i: int) -> float:
+        wav, seconds = workload[i]
+        response = await client.post("/api/stt", files={"audio": ("bench.wav", wav, "audio/wav")})
+        response.raise_for_status()
+        return seconds
+
+    try:
+        samples, wall = await run_load(call, args.requests, args.concurrency)
+    finally:
+        await client.aclose()
+
+    report = {
+        "benchmark": "stt.load",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": summarize(samples, wall),
+    }
+    raise SystemExit(emit(report, args.output, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
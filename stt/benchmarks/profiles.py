@@ -0,0 +1,184 @@
+"""Benchmark: realtime factor and word error rate per STT inference profile.
+
+Transcribes the sample set in benchmarks/samples/manifest.jsonl (one JSON
+line per sample: audio file, reference text and source) with the real
+onnx-asr model and Silero VAD, the way the service does: VAD segments, then
+one batched recognition. Each profile is loaded once and the set is
+transcribed --runs times after one warm-up pass.
+
+No audio is bundled. The bundled manifest lists "synthetic" samples, which
+are synthesized with a running tts service when --tts-url is given. Their
+WER (wer_synthetic) measures how well the ASR reads back our own TTS, not
+real speech: it is only fit for comparing profiles with each other. Add
+real recordings to the manifest with "source": "recorded" to get
+wer_recorded. Needs benchmarks/requirements.txt installed. Run from the
+stt directory:
+
+    python -m benchmarks.profiles --tts-url http://localhost:8002
+    python -m benchmarks.profiles --profiles fp32,int8 --threads 1,4 --output cpu.json
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+import numpy as np
+import onnx_asr
+
+from app.config import settings
+from app.services.profile import InferenceProfile
+from benchmarks.harness import emit
+from benchmarks.stubs import SAMPLE_RATE
+
+SAMPLES = Path(__file__).parent / "samples"
+
+_CPU = ("CPUExecutionProvider",)
+PROFILES = {
+    "settings": InferenceProfile.from_settings(settings),
+    "fp32": InferenceProfile(providers=_CPU),
+    "int8": InferenceProfile(quantization="int8", providers=_CPU),
+    "int8-basic": InferenceProfile(quantization="int8", providers=_CPU, graph_optimization="basic"),
+}
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple[int, int]:
+    """Word-level edit distance and the number of reference words."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def _load_samples(manifest: Path, tts_url: str | None) -> list[tuple[np.ndarray, str, str]]:
+    samples = []
+    for line in manifest.read_text().splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        path = manifest.parent / entry["audio"]
+        if not path.exists():
+            if not tts_url:
+                raise SystemExit(f"{path} is missing; pass --tts-url to synthesize it")
+            response = httpx.post(
+                f"{tts_url}/api/tts/synthesize", json={"text": entry["text"]}, timeout=300
+            )
+            response.raise_for_status()
+            path.write_bytes(response.content)
+        pcm = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-i", str(path),
+             "-ar", str(SAMPLE_RATE), "-ac", "1", "-f", "f32le", "pipe:1"],
+            capture_output=True, check=True,
+        ).stdout
+        source = entry.get("source", "synthetic")  # never count unlabelled audio as speech
+        if source not in ("synthetic", "recorded"):
+            raise SystemExit(f"{entry['audio']}: source must be 'synthetic' or 'recorded'")
+        samples.append((np.frombuffer(pcm, dtype=np.float32), entry["text"], source))
+    return samples
+
+
+def _transcribe(model, vad, profile: InferenceProfile, waveform: np.ndarray) -> str:
+    bounds = next(vad.segment_batch(
+        waveform[None, :], np.array([len(waveform)]), SAMPLE_RATE, **profile.vad_options()
+    ))
+    texts = model.recognize([waveform[a:b] for a, b in bounds], sample_rate=SAMPLE_RATE)
+    return " ".join(t for t in texts if t)
+
+
+def _run_profile(profile: InferenceProfile, samples: list, runs: int) -> dict:
+    t0 = time.perf_counter()
+    model = onnx_asr.load_model(profile.model, **profile.model_kwargs())
+    vad = onnx_asr.load_vad("silero", **profile.vad_kwargs())
+    load_s = time.perf_counter() - t0
+
+    for waveform, _, _ in samples:  # warm-up
+        _transcribe(model, vad, profile, waveform)
+    compute = 0.0
+    errors = {"synthetic": [0, 0], "recorded": [0, 0]}  # source -> [errors, words]
+    for _ in range(runs):
+        for waveform, reference, source in samples:
+            t0 = time.perf_counter()
+            text = _transcribe(model, vad, profile, waveform)
+            compute += time.perf_counter() - t0
+            e, n = word_errors(reference, text)
+            errors[source][0] += e
+            errors[source][1] += n
+    audio = runs * sum(len(w) for w, _, _ in samples) / SAMPLE_RATE
+    return {
+        "profile": profile.describe(),
+        "load_s": round(load_s, 2),
+        "audio_s": round(audio, 2),
+        "compute_s": round(compute, 3),
+        # Audio seconds per compute second, as in stt_realtime_factor
+        "realtime_factor": round(audio / compute, 2) if compute else 0.0,
+        # WER per audio source; None without samples of that source
+        **{
+            f"wer_{source}": round(e / n, 4) if n else None
+            for source, (e, n) in errors.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--profiles", default="fp32,int8", help=f"comma-separated, from {', '.join(PROFILES)}"
+    )
+    parser.add_argument(
+        "--threads", default="", help="comma-separated intra-op thread counts to sweep"
+    )
+    parser.add_argument("--manifest", default=str(SAMPLES / "manifest.jsonl"))
+    parser.add_argument("--tts-url", help="synthesize missing sample audio with this tts service")
+    parser.add_argument("--runs", type=int, default=3, help="timed passes over the sample set")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    samples = _load_samples(Path(args.manifest), args.tts_url)
+    threads = [int(n) for n in args.threads.split(",") if n] or [None]
+    results = {}
+    for name in args.profiles.split(","):
+        for count in threads:
+            profile = PROFILES[name]
+            label = name
+            if count is not None:
+                profile = replace(profile, intra_op_threads=count)
+                label = f"{name}-{count}t"
+            results[label] = _run_profile(profile, samples, args.runs)
+            r = results[label]
+            wer = "  ".join(
+                f"WER {source} {r[f'wer_{source}']:6.1%}"
+                for source in ("synthetic", "recorded")
+                if r[f"wer_{source}"] is not None
+            )
+            print(
+                f"{label:<16} {r['realtime_factor']:7.2f}x realtime  {wer}  "
+                f"load {r['load_s']:5.1f} s",
+                file=sys.stderr,
+            )
+
+    report = {
+        "benchmark": "stt.profiles",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "samples": len(samples),
+            "recorded_samples": sum(1 for s in samples if s[2] == "recorded"),
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+    raise SystemExit(emit(report, args.output, None, 0.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""CPU stand-ins for the real models, shared by the benchmarks."""
+import io
+import time
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class StubAsr:
+    """Stand-in for the onnx-asr recognizer without VAD.
+
+    A call blocks like CPU inference does: ``seconds_per_batch`` for the
+    forward pass plus ``seconds_per_audio_second`` per second of padded
+    audio, i.e. the longest waveform times the batch size.
+    """
+
+    def __init__(
+        self, seconds_per_audio_second: float = 0.02, seconds_per_batch: float = 0.0
+    ) -> None:
+        self._cost = seconds_per_audio_second
+        self._batch_cost = seconds_per_batch
+
+    def recognize(
+        self, waveform: np.ndarray | list[np.ndarray], sample_rate: int = SAMPLE_RATE
+    ) -> str | list[str]:
+        batch = waveform if isinstance(waveform, list) else [waveform]
+        padded = max((len(w) for w in batch), default=0) * len(batch) / sample_rate
+        time.sleep(self._batch_cost + padded * self._cost)
+        texts = [f"segment van {len(w) / sample_rate:.1f}s" for w in batch]
+        return texts if isinstance(waveform, list) else texts[0]
+
+
+class StubVad:
+    """Stand-in for the Silero VAD: splits audio into speech segments of
+    ``segment_seconds``, separated by half a second of silence."""
+
+    def __init__(self, segment_seconds: float = 8.0) -> None:
+        self._segment = int(segment_seconds * SAMPLE_RATE)
+
+    def segment_batch(self, waveforms, waveforms_len, sample_rate, **kwargs):
+        gap = sample_rate // 2
+        for length in waveforms_len:
+            starts = range(0, int(length), self._segment + gap)
+            yield iter([(s, min(s + self._segment, int(length))) for s in starts])
+
+
+def make_wav(seconds: float, rng: np.random.Generator) -> bytes:
+    """16 kHz mono WAV of low-level noise, so every file hashes differently."""
+    samples = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 300).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(samples.tobytes())
+    return buf.getvalue()
@@ -4,11 +4,41 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     tts_piper_enabled: bool = True
     tts_parkiet_enabled: bool = True
-    tts_piper_model: str = "nl_NL-pim-medium"
+    tts_piper_model: str = "nl_NL-pim-medium"  # default voice; others in tts_models_dir load on use
+    tts_piper_workers: int = 2  # 0 = one piper subprocess per request
+    tts_piper_max_voices: int = 4  # voices kept loaded in each Piper worker
+    tts_piper_voice_memory_mb: int = 0  # per-worker budget for loaded voices; 0 = no limit
+    tts_parkiet_batch_window_ms: int = 50  # wait this long to fill a batch
+    tts_parkiet_max_batch: int = 4
+    tts_parkiet_max_chunk_chars: int = 300  # longer texts are split and crossfaded
+    tts_parkiet_crossfade_ms: int = 40
+    tts_parkiet_idle_unload_seconds: int = 300  # free VRAM after this long without requests
+    tts_prewarm_models: bool = True  # load Parkiet in the background at startup
+    tts_prewarm_hours: str = ""  # comma-separated hours of day to prewarm, e.g. "4"
+    tts_model_memory_budget_mb: int = 0  # 0 = no limit
     tts_default_engine: str = "piper"
     tts_cache_ttl_days: int = 7
     tts_cache_dir: str = "/data/tts-cache"
+    tts_cache_memory_mb: int = 64  # in-memory hot tier in front of the disk cache
     tts_models_dir: str = "/app/models"
+    tts_stream_lookahead: int = 2  # sentences synthesized ahead while streaming
+    tts_sentence_gap_ms: int = 150  # silence between stitched sentences
+    tts_encoder_workers: int = 2  # concurrent ffmpeg encodes
+    tts_mp3_bitrate: str = "128k"
+    tts_opus_bitrate: str = "24k"
+    tts_job_workers: int = 1  # concurrent background jobs; stored under {tts_cache_dir}/_jobs
+    tts_job_retention_hours: int = 24  # forget finished jobs after this long
+    tts_cache_prewarm_enabled: bool = True  # refill the cache in the background at startup
+    tts_cache_prewarm_phrases: str = ""  # file with one standard phrase per line
+    tts_cache_prewarm_formats: str = "wav"  # comma-separated formats to prewarm phrases in
+    tts_cache_prewarm_top_requests: int = 200  # also prewarm the most requested texts
+    # Access log: requests are counted by hash; the text is only kept once requested this often
+    tts_access_log_min_count: int = 3
+    tts_access_log_max_age_days: int = 14  # forget requests not seen for this long
+    tts_access_log_max_entries: int = 5000
+    tts_cache_prewarm_interval_ms: int = 250  # pause after each synthesized item
+    tts_trace_dir: str = ""  # write per-request stage traces here as JSON; empty = off
+    tts_trace_sample_rate: float = 1.0  # fraction of requests to trace when enabled
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
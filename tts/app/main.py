@@ -3,13 +3,22 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.config import settings
+from app.metrics import QUEUE_DEPTH, MetricsMiddleware
 from app.routers.tts import router as tts_router
+from app.services.access_log import AccessLog
 from app.services.audio_cache import AudioCache
+from app.services.encoder import AudioEncoder
 from app.services.engines.parkiet import ParkietEngine
 from app.services.engines.piper import PiperEngine
+from app.services.jobs import JobQueue
+from app.services.prewarm import CachePrewarmer
+from app.services.residency import ResidencyManager
 from app.services.tts_service import TTSService
+from app.services.voices import VoiceRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,28 +30,114 @@ async def lifespan(app: FastAPI):
     parkiet: ParkietEngine | None = None
 
     if settings.tts_piper_enabled:
-        model_path = f"{settings.tts_models_dir}/{settings.tts_piper_model}.onnx"
-        piper = PiperEngine(model_path=model_path)
-        logger.info("Piper engine ready (model: %s)", settings.tts_piper_model)
+        voices = VoiceRegistry(
+            settings.tts_models_dir,
+            settings.tts_piper_model,
+            max_resident=settings.tts_piper_max_voices,
+            memory_budget_bytes=settings.tts_piper_voice_memory_mb * 1024 * 1024,
+        )
+        piper = PiperEngine(voices, workers=settings.tts_piper_workers)
+        await piper.start()
+        logger.info("Piper engine ready (default voice: %s)", settings.tts_piper_model)
 
     if settings.tts_parkiet_enabled:
-        parkiet = ParkietEngine()
+        parkiet = ParkietEngine(
+            batch_window_ms=settings.tts_parkiet_batch_window_ms,
+            max_batch=settings.tts_parkiet_max_batch,
+            max_chunk_chars=settings.tts_parkiet_max_chunk_chars,
+            crossfade_ms=settings.tts_parkiet_crossfade_ms,
+        )
         logger.info(
             "Parkiet engine configured (GPU available: %s)",
             parkiet.is_available(),
         )
 
-    cache = AudioCache(settings.tts_cache_dir, settings.tts_cache_ttl_days)
-    app.state.tts = TTSService(piper, parkiet, cache, settings.tts_default_engine)
+    cache = AudioCache(
+        settings.tts_cache_dir,
+        settings.tts_cache_ttl_days,
+        memory_bytes=settings.tts_cache_memory_mb * 1024 * 1024,
+    )
+    access_log = AccessLog(
+        f"{settings.tts_cache_dir}/_prewarm/access_log.json",
+        max_entries=settings.tts_access_log_max_entries,
+        min_count=settings.tts_access_log_min_count,
+        max_age_days=settings.tts_access_log_max_age_days,
+    )
+    app.state.tts = TTSService(
+        piper,
+        parkiet,
+        cache,
+        settings.tts_default_engine,
+        encoder=AudioEncoder(
+            settings.tts_encoder_workers,
+            mp3_bitrate=settings.tts_mp3_bitrate,
+            opus_bitrate=settings.tts_opus_bitrate,
+        ),
+        stream_lookahead=settings.tts_stream_lookahead,
+        sentence_gap_ms=settings.tts_sentence_gap_ms,
+        access_log=access_log,
+    )
+    jobs = JobQueue(
+        app.state.tts,
+        f"{settings.tts_cache_dir}/_jobs",
+        workers=settings.tts_job_workers,
+        retention_hours=settings.tts_job_retention_hours,
+    )
+    await jobs.start()
+    app.state.jobs = jobs
+    for priority in ("interactive", "batch"):
+        QUEUE_DEPTH.labels(f"jobs_{priority}").set_function(
+            lambda p=priority: jobs.depth()[p]
+        )
+    if parkiet:
+        QUEUE_DEPTH.labels("parkiet_batch").set_function(parkiet.queue_depth)
+    residency = ResidencyManager(
+        [parkiet] if parkiet else [],
+        idle_unload_seconds=settings.tts_parkiet_idle_unload_seconds,
+        memory_budget_bytes=settings.tts_model_memory_budget_mb * 1024 * 1024,
+        prewarm_on_start=settings.tts_prewarm_models,
+        prewarm_hours={int(h) for h in settings.tts_prewarm_hours.split(",") if h.strip()},
+    )
+    residency.start()
+    app.state.residency = residency
+    prewarmer = CachePrewarmer(
+        app.state.tts,
+        access_log,
+        phrases_file=settings.tts_cache_prewarm_phrases,
+        formats=[f.strip() for f in settings.tts_cache_prewarm_formats.split(",") if f.strip()],
+        top_requests=settings.tts_cache_prewarm_top_requests,
+        interval_ms=settings.tts_cache_prewarm_interval_ms,
+    )
+    await prewarmer.start(prewarm=settings.tts_cache_prewarm_enabled)
+    app.state.prewarmer = prewarmer
     logger.info("TTS service ready. Default engine: %s", settings.tts_default_engine)
     yield
 
+    await prewarmer.close()
+    await jobs.close()
+    await residency.close()
+    if piper:
+        piper.close()
+    if parkiet:
+        parkiet.close()
+
 
 app = FastAPI(title="Memories TTS Service", version="0.1.0", lifespan=lifespan)
 
+app.add_middleware(
+    MetricsMiddleware,
+    trace_dir=settings.tts_trace_dir,
+    trace_sample_rate=settings.tts_trace_sample_rate,
+)
+
 app.include_router(tts_router)
 
 
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok", "service": "memories-tts"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,26 +1,80 @@
+import json
 import logging
-import subprocess
+import os
+import re
+import uuid
+from collections.abc import AsyncIterator
+from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
-from app.schemas.tts import EngineInfo, EnginesResponse, SynthesizeRequest
+from app.schemas.tts import (
+    BatchItemResult,
+    BatchSynthesizeRequest,
+    BatchSynthesizeResponse,
+    EngineInfo,
+    EnginesResponse,
+    JobStatus,
+    JobSubmitRequest,
+    StreamSynthesizeRequest,
+    SynthesizeRequest,
+    VoiceInfo,
+)
+from app.services.audio import wav_stream_header
+from app.services.encoder import MEDIA_TYPES
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tts")
 
+_RE_AUDIO_ID = re.compile(r"^[0-9a-f]{64}\.(wav|mp3-\w+|opus-\w+)$")
+_MAX_JOB_WAIT_SECONDS = 60
+# Audio IDs are content addresses, so clients may keep a response for a day
+_AUDIO_CACHE_CONTROL = "public, max-age=86400"
 
-def wav_to_mp3(wav_bytes: bytes) -> bytes:
-    """Convert WAV audio to MP3 using ffmpeg."""
-    proc = subprocess.run(
-        ["ffmpeg", "-i", "pipe:0", "-f", "mp3", "-ab", "128k", "-ac", "1", "pipe:1"],
-        input=wav_bytes,
-        capture_output=True,
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(f"ffmpeg conversion failed: {proc.stderr.decode()[-200:]}")
-    return proc.stdout
+
+def _error_status(exc: Exception) -> tuple[int, str]:
+    """Map a synthesis exception to the status/detail the endpoints use."""
+    if isinstance(exc, ValueError):
+        return 400, str(exc)
+    if isinstance(exc, RuntimeError):
+        return 503, "TTS synthese mislukt"
+    return 500, "Interne fout"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def _cached_audio_response(
+    request: Request,
+    audio_id: str,
+    headers: dict[str, str] | None = None,
+    found: tuple[Path, os.stat_result] | None = None,
+) -> Response:
+    """Serve cached audio from its cache file, with the audio ID as strong ETag.
+
+    Answers a matching If-None-Match with 304; Range requests are handled
+    by FileResponse. ``found`` is the file when the caller already looked
+    it up.
+    """
+    tts: object = request.app.state.tts
+    if found is None:
+        found = await tts.audio_file(audio_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Audio niet gevonden")
+    etag = f'"{audio_id}"'
+    headers = {"ETag": etag, "Cache-Control": _AUDIO_CACHE_CONTROL, **(headers or {})}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    media_type = MEDIA_TYPES[audio_id.split(".", 1)[1].split("-", 1)[0]]
+    path, stat = found
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
 
 
 @router.post("/synthesize")
@@ -28,36 +82,243 @@ async def synthesize(req: SynthesizeRequest, request: Request) -> Response:
     """Convert text to audio using the selected engine."""
     tts: object = request.app.state.tts
     try:
-        result = await tts.synthesize(req.text, req.engine, req.voice)
+        result = await tts.synthesize(
+            req.text, req.engine, req.voice, req.output_format, load=False
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail="TTS synthese mislukt")
 
-    audio = result.audio
-    media_type = "audio/wav"
+    headers = {
+        "X-Engine-Used": result.engine_used,
+        "X-Cached": str(result.cached).lower(),
+        "X-Cache-Sentences": f"{result.sentences_cached}/{result.sentences}",
+        "X-Duration-Ms": str(result.duration_ms),
+    }
+    if result.audio_id:
+        # Re-fetchable from /api/tts/audio/{id}
+        headers.update({"X-Audio-Id": result.audio_id, "ETag": f'"{result.audio_id}"'})
+    if result.file is not None:
+        return await _cached_audio_response(request, result.audio_id, headers, result.file)
+    return Response(content=result.audio, media_type=MEDIA_TYPES[result.format], headers=headers)
+
+
+@router.post("/synthesize/stream")
+async def synthesize_stream(req: StreamSynthesizeRequest, request: Request) -> StreamingResponse:
+    """Stream audio sentence by sentence while the rest is still being synthesized."""
+    tts: object = request.app.state.tts
+    chunks = tts.synthesize_stream(req.text, req.engine, req.voice)
+    # Synthesize the first sentence before responding, so errors still map to a status code
+    try:
+        first_pcm, sample_rate = await anext(chunks)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="TTS synthese mislukt")
 
-    if req.output_format == "mp3":
+    async def pcm_chunks() -> AsyncIterator[bytes]:
+        yield first_pcm
         try:
-            audio = wav_to_mp3(audio)
-            media_type = "audio/mpeg"
-        except RuntimeError:
-            logger.exception("WAV-to-MP3 conversion failed, returning WAV")
+            async for pcm, _ in chunks:
+                yield pcm
+        except Exception:
+            # Headers are already sent; all we can do is end the stream early
+            logger.exception("Streaming synthesis aborted")
+
+    async def wav_body() -> AsyncIterator[bytes]:
+        yield wav_stream_header(sample_rate)
+        async for pcm in pcm_chunks():
+            yield pcm
+
+    if req.output_format == "pcm":
+        body, media_type = pcm_chunks(), f"audio/L16; rate={sample_rate}; channels=1"
+    elif req.output_format == "wav":
+        body, media_type = wav_body(), MEDIA_TYPES["wav"]
+    else:
+        body = tts.encoder.encode_stream(pcm_chunks(), sample_rate, req.output_format)
+        media_type = MEDIA_TYPES[req.output_format]
 
-    return Response(
-        content=audio,
+    return StreamingResponse(
+        body,
         media_type=media_type,
-        headers={
-            "X-Engine-Used": result.engine_used,
-            "X-Cached": str(result.cached).lower(),
-            "X-Duration-Ms": str(result.duration_ms),
+        headers={"X-Sample-Rate": str(sample_rate)},
+    )
+
+
+@router.post("/synthesize/batch", response_model=None)
+async def synthesize_batch(
+    req: BatchSynthesizeRequest, request: Request
+) -> BatchSynthesizeResponse | StreamingResponse:
+    """Synthesize many items in one call; each item succeeds or fails on its own.
+
+    ``response="multipart"`` streams a multipart/mixed body with one part per
+    item in completion order (cache hits first). ``response="ids"`` returns
+    JSON with an audio ID per item, to be fetched from ``/api/tts/audio/{id}``.
+    """
+    tts: object = request.app.state.tts
+    ids = [str(raw["id"]) if raw.get("id") is not None else None for raw in req.items]
+    results: list[BatchItemResult | None] = [None] * len(req.items)
+    valid: list[tuple[int, SynthesizeRequest]] = []
+    for i, raw in enumerate(req.items):
+        try:
+            valid.append((i, SynthesizeRequest.model_validate(raw)))
+        except ValidationError as exc:
+            error = "; ".join(e["msg"] for e in exc.errors())
+            results[i] = BatchItemResult(index=i, id=ids[i], status=422, error=error)
+
+    async def run() -> AsyncIterator[tuple[BatchItemResult, bytes | None]]:
+        for i in range(len(results)):
+            if results[i] is not None:
+                yield results[i], None
+        requests = [(r.text, r.engine, r.voice, r.output_format) for _, r in valid]
+        # The JSON response only needs audio IDs, so cached items stay on disk
+        load = req.response != "ids"
+        async for n, outcome in tts.synthesize_many(requests, load=load):
+            i, item = valid[n]
+            if isinstance(outcome, Exception):
+                status, detail = _error_status(outcome)
+                if status == 500:
+                    logger.error("Batch item %d failed", i, exc_info=outcome)
+                yield BatchItemResult(index=i, id=ids[i], status=status, error=detail), None
+                continue
+            # Only the JSON response hands out IDs; multipart carries the audio itself
+            audio_id = outcome.audio_id
+            if req.response == "ids":
+                audio_id = await tts.publish(outcome, item.text, item.voice)
+            yield BatchItemResult(
+                index=i,
+                id=ids[i],
+                status=200,
+                audio_id=audio_id,
+                engine_used=outcome.engine_used,
+                cached=outcome.cached,
+                format=outcome.format,
+            ), outcome.audio
+
+    if req.response == "ids":
+        items = [item async for item, _ in run()]
+        return BatchSynthesizeResponse(items=sorted(items, key=lambda r: r.index))
+
+    boundary = uuid.uuid4().hex
+
+    async def multipart() -> AsyncIterator[bytes]:
+        async for item, audio in run():
+            if audio is None:
+                content_type, body = "application/json", json.dumps({"detail": item.error}).encode()
+            else:
+                content_type, body = MEDIA_TYPES[item.format], audio
+            headers = {
+                "Content-Type": content_type,
+                "X-Item-Index": str(item.index),
+                "X-Item-Status": str(item.status),
+            }
+            if item.id is not None:
+                headers["X-Item-Id"] = item.id
+            if item.audio_id:
+                headers.update({
+                    "X-Audio-Id": item.audio_id,
+                    "X-Engine-Used": item.engine_used,
+                    "X-Cached": str(item.cached).lower(),
+                })
+            head = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+            yield f"--{boundary}\r\n{head}\r\n".encode() + body + b"\r\n"
+        yield f"--{boundary}--\r\n".encode()
+
+    return StreamingResponse(multipart(), media_type=f"multipart/mixed; boundary={boundary}")
+
+
+@router.api_route("/audio/{audio_id}", methods=["GET", "HEAD"])
+async def get_audio(audio_id: str, request: Request) -> Response:
+    """Fetch cached audio by its audio ID (the cache key).
+
+    IDs come from batch responses, jobs and the X-Audio-Id header. Supports
+    If-None-Match and Range, so players can revalidate and seek cheaply.
+    """
+    if not _RE_AUDIO_ID.match(audio_id):
+        raise HTTPException(status_code=404, detail="Audio niet gevonden")
+    return await _cached_audio_response(request, audio_id)
+
+
+def _job_status(job: object) -> JobStatus:
+    return JobStatus(
+        id=job.id,
+        status=job.status,
+        priority=job.priority,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        engine_used=job.engine_used,
+        cached=job.cached,
+        format=job.output_format,
+        error=job.error,
+    )
+
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(req: JobSubmitRequest, request: Request) -> JobStatus:
+    """Queue a synthesis job; poll ``/jobs/{id}`` and download ``/jobs/{id}/audio``."""
+    jobs: object = request.app.state.jobs
+    job = await jobs.submit(req.text, req.engine, req.voice, req.output_format, req.priority)
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str, request: Request, wait: float = 0) -> JobStatus:
+    """Job status. With ``wait`` (seconds, max 60) the call blocks until the job finishes."""
+    jobs: object = request.app.state.jobs
+    job = await jobs.wait(job_id, min(max(wait, 0), _MAX_JOB_WAIT_SECONDS))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job niet gevonden")
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/audio")
+async def job_audio(job_id: str, request: Request) -> Response:
+    """Download the audio of a finished job."""
+    jobs: object = request.app.state.jobs
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job niet gevonden")
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="Job is nog niet klaar")
+    return await _cached_audio_response(
+        request,
+        job.audio_id,
+        {
+            "X-Audio-Id": job.audio_id,
+            "X-Engine-Used": job.engine_used,
+            "X-Cached": str(job.cached).lower(),
         },
     )
 
 
+@router.get("/cache/stats")
+async def cache_stats(request: Request) -> dict:
+    """Cache hit statistics since startup."""
+    tts: object = request.app.state.tts
+    return tts.stats()
+
+
+@router.get("/cache/prewarm")
+async def cache_prewarm(request: Request) -> dict:
+    """Progress and coverage of the background cache prewarm."""
+    prewarmer: object = request.app.state.prewarmer
+    return prewarmer.progress()
+
+
+@router.get("/models")
+async def models(request: Request) -> dict:
+    """Load state, memory footprint and load/unload latency of managed models."""
+    residency: object = request.app.state.residency
+    return {"models": residency.status()}
+
+
 @router.get("/engines", response_model=EnginesResponse)
 async def engines(request: Request) -> EnginesResponse:
-    """List available TTS engines and their status."""
+    """List available TTS engines, their status and voices."""
     tts: object = request.app.state.tts
     available = tts.available_engines()
     engine_list = [
@@ -66,6 +327,7 @@ async def engines(request: Request) -> EnginesResponse:
             available=e.is_available(),
             quality=e.quality,
             speed=e.speed,
+            voices=[VoiceInfo(**v) for v in e.voices()],
         )
         for e in available
     ]
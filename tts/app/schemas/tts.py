@@ -1,11 +1,15 @@
+from typing import Any
+
 from pydantic import BaseModel, field_validator
 
+MAX_BATCH_ITEMS = 100
+
 
 class SynthesizeRequest(BaseModel):
     text: str
     engine: str = "auto"           # "piper" | "parkiet" | "auto"
     voice: str = "default"
-    output_format: str = "wav"     # "wav" | "mp3"
+    output_format: str = "wav"     # "wav" | "mp3" | "opus"
 
     @field_validator("engine")
     @classmethod
@@ -18,7 +22,7 @@ class SynthesizeRequest(BaseModel):
     @field_validator("output_format")
     @classmethod
     def validate_output_format(cls, v: str) -> str:
-        allowed = {"wav", "mp3"}
+        allowed = {"wav", "mp3", "opus"}
         if v not in allowed:
             raise ValueError(f"output_format must be one of {allowed}")
         return v
@@ -34,11 +38,99 @@ class SynthesizeRequest(BaseModel):
         return v
 
 
+class StreamSynthesizeRequest(SynthesizeRequest):
+    output_format: str = "wav"     # "wav" | "pcm" | "mp3" | "opus"
+
+    @field_validator("output_format")
+    @classmethod
+    def validate_output_format(cls, v: str) -> str:
+        allowed = {"wav", "pcm", "mp3", "opus"}
+        if v not in allowed:
+            raise ValueError(f"output_format must be one of {allowed}")
+        return v
+
+
+class BatchSynthesizeRequest(BaseModel):
+    # Items are validated one by one as SynthesizeRequest (plus an optional
+    # "id"), so one bad item does not reject the whole batch
+    items: list[dict[str, Any]]
+    response: str = "multipart"    # "multipart" | "ids"
+
+    @field_validator("items")
+    @classmethod
+    def validate_items(cls, v: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if not v:
+            raise ValueError("items may not be empty")
+        if len(v) > MAX_BATCH_ITEMS:
+            raise ValueError(f"too many items (max {MAX_BATCH_ITEMS})")
+        return v
+
+    @field_validator("response")
+    @classmethod
+    def validate_response(cls, v: str) -> str:
+        allowed = {"multipart", "ids"}
+        if v not in allowed:
+            raise ValueError(f"response must be one of {allowed}")
+        return v
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: str | None = None
+    status: int                    # HTTP-style status of this item
+    audio_id: str | None = None    # fetch via GET /api/tts/audio/{audio_id}
+    engine_used: str | None = None
+    cached: bool | None = None
+    format: str | None = None
+    error: str | None = None
+
+
+class BatchSynthesizeResponse(BaseModel):
+    items: list[BatchItemResult]
+
+
+class JobSubmitRequest(SynthesizeRequest):
+    priority: str = "batch"        # "interactive" | "batch"
+
+    @field_validator("priority")
+    @classmethod
+    def validate_priority(cls, v: str) -> str:
+        allowed = {"interactive", "batch"}
+        if v not in allowed:
+            raise ValueError(f"priority must be one of {allowed}")
+        return v
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str                    # "queued" | "running" | "done" | "failed"
+    priority: str
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    engine_used: str | None = None
+    cached: bool | None = None
+    format: str
+    error: str | None = None
+
+
+class VoiceInfo(BaseModel):
+    id: str
+    language: str
+    quality: str
+    sample_rate: int
+    size_bytes: int
+    default: bool
+    resident: bool                 # loaded in the engine's workers
+    idle_seconds: float | None = None
+
+
 class EngineInfo(BaseModel):
     id: str
     available: bool
     quality: str   # "basic" | "high"
     speed: str     # "fast" | "slow"
+    voices: list[VoiceInfo] = []
 
 
 class EnginesResponse(BaseModel):
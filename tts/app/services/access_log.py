@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# (engine, voice, text, output_format)
+Request = tuple[str, str, str, str]
+
+
+def _digest(engine: str, voice: str, text: str, output_format: str) -> str:
+    return hashlib.sha256(f"{engine}\0{voice}\0{output_format}\0{text}".encode()).hexdigest()
+
+
+class AccessLog:
+    """Counts synthesis requests so the most popular ones can be prewarmed.
+
+    Requests are counted by a SHA-256 digest. The text itself is only kept
+    once a request has been seen ``min_count`` times, so one-off texts never
+    reach memory or disk; only repeated phrases, the ones worth prewarming,
+    do. Entries not requested for ``max_age_days`` are dropped, and at most
+    ``max_entries`` are kept: past that the least requested half goes.
+    Counts are saved to ``path`` as JSON.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        min_count: int = 3,
+        max_age_days: float = 14,
+    ) -> None:
+        self._path = Path(path)
+        self._max_entries = max_entries
+        self._min_count = max(1, min_count)
+        self._max_age_seconds = max_age_days * 86400
+        # digest -> {"request": [engine, voice, format], "text", "count", "last_seen"}
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+
+    def record(self, engine: str, voice: str, text: str, output_format: str) -> None:
+        digest = _digest(engine, voice, text, output_format)
+        entry = self._entries.setdefault(
+            digest, {"request": [engine, voice, output_format], "text": None, "count": 0}
+        )
+        entry["count"] += 1
+        entry["last_seen"] = time.time()
+        if entry["count"] >= self._min_count:
+            entry["text"] = text
+        self._dirty = True
+        if len(self._entries) > self._max_entries:
+            self._trim()
+
+    def top(self, n: int) -> list[Request]:
+        known = [e for e in self._entries.values() if e["text"] is not None]
+        known.sort(key=lambda e: e["count"], reverse=True)
+        return [(e["request"][0], e["request"][1], e["text"], e["request"][2]) for e in known[:n]]
+
+    def _trim(self) -> None:
+        cutoff = time.time() - self._max_age_seconds
+        entries = {d: e for d, e in self._entries.items() if e["last_seen"] >= cutoff}
+        if len(entries) > self._max_entries:
+            ranked = sorted(entries.items(), key=lambda item: item[1]["count"], reverse=True)
+            entries = dict(ranked[: self._max_entries // 2])
+        self._entries = entries
+
+    async def load(self) -> None:
+        entries = await asyncio.to_thread(self._read)
+        if not isinstance(entries, dict):
+            logger.warning("Replacing access log %s in an old format", self._path)
+            # Saving overwrites the old file, which stored every text in full
+            self._dirty = True
+            return
+        self._entries.update(entries)
+        self._trim()
+
+    async def save(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._trim()
+        await asyncio.to_thread(self._write, dict(self._entries))
+
+    def _read(self) -> dict | list:
+        try:
+            return json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable access log %s", self._path)
+            return {}
+
+    def _write(self, entries: dict) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries))
+        tmp.replace(self._path)
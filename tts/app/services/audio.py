@@ -0,0 +1,102 @@
+import io
+import struct
+import wave
+
+# Data-size placeholder for WAV headers of streams whose length is unknown
+_STREAM_DATA_SIZE = 0xFFFFFFFF - 36
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)  # 16-bit
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+def wav_to_pcm(wav_bytes: bytes) -> tuple[bytes, int]:
+    """Extract raw 16-bit mono PCM and its sample rate from a WAV container."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError("expected 16-bit mono WAV")
+        return wf.readframes(wf.getnframes()), wf.getframerate()
+
+
+def wav_duration(wav_bytes: bytes) -> float:
+    """Duration of a WAV file in seconds, read from its header."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """WAV header for a 16-bit mono stream of unknown length.
+
+    The RIFF and data sizes are set to their maximum, which players treat as
+    "read until end of stream".
+    """
+    byte_rate = sample_rate * 2
+    return (
+        b"RIFF" + struct.pack("<I", _STREAM_DATA_SIZE + 36) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, byte_rate, 2, 16)
+        + b"data" + struct.pack("<I", _STREAM_DATA_SIZE)
+    )
+
+
+def resample_pcm(pcm: bytes, from_rate: int, to_rate: int) -> bytes:
+    """Linear-interpolation resample of 16-bit mono PCM."""
+    if from_rate == to_rate or not pcm:
+        return pcm
+    import numpy as np
+
+    samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    n_out = int(len(samples) * to_rate / from_rate)
+    positions = np.linspace(0, len(samples) - 1, n_out)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16).tobytes()
+
+
+def concat_wavs(wavs: list[bytes], gap_ms: int = 0) -> bytes:
+    """Join 16-bit mono WAVs into one, with ``gap_ms`` of silence in between.
+
+    Parts with a different sample rate are resampled to that of the first part.
+    """
+    if len(wavs) == 1:
+        return wavs[0]
+    pcm_parts: list[bytes] = []
+    sample_rate = 0
+    for wav in wavs:
+        pcm, rate = wav_to_pcm(wav)
+        if not sample_rate:
+            sample_rate = rate
+        pcm_parts.append(resample_pcm(pcm, rate, sample_rate))
+    gap = b"\x00\x00" * (sample_rate * gap_ms // 1000)
+    return pcm_to_wav(gap.join(pcm_parts), sample_rate)
+
+
+def crossfade_wavs(wavs: list[bytes], crossfade_ms: int = 40) -> bytes:
+    """Join 16-bit mono WAVs, overlapping neighbours with a linear crossfade.
+
+    All parts must share the sample rate of the first part.
+    """
+    if len(wavs) == 1:
+        return wavs[0]
+    import numpy as np
+
+    parts: list = []
+    sample_rate = 0
+    for wav in wavs:
+        pcm, rate = wav_to_pcm(wav)
+        sample_rate = sample_rate or rate
+        parts.append(np.frombuffer(resample_pcm(pcm, rate, sample_rate), dtype=np.int16))
+
+    out = parts[0].astype(np.float32)
+    for part in parts[1:]:
+        part = part.astype(np.float32)
+        n = min(sample_rate * crossfade_ms // 1000, len(out), len(part))
+        if n:
+            fade = np.linspace(0.0, 1.0, n, dtype=np.float32)
+            out[-n:] = out[-n:] * (1.0 - fade) + part[:n] * fade
+        out = np.concatenate([out, part[n:]])
+    return pcm_to_wav(np.clip(out, -32768, 32767).astype(np.int16).tobytes(), sample_rate)
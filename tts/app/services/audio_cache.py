@@ -1,7 +1,10 @@
+import asyncio
 import hashlib
 import logging
+import os
 import time
 import unicodedata
+from collections import OrderedDict
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -14,31 +17,139 @@ def _cache_key(engine_id: str, voice: str, text: str) -> str:
 
 
 class AudioCache:
-    def __init__(self, cache_dir: str, ttl_days: int = 7) -> None:
+    """Two-tier audio cache: a byte-bounded in-memory LRU in front of disk.
+
+    Disk access runs in a worker thread so it never blocks the event loop.
+    """
+
+    def __init__(
+        self, cache_dir: str, ttl_days: int = 7, memory_bytes: int = 64 * 1024 * 1024
+    ) -> None:
         self._root = Path(cache_dir)
         self._ttl_seconds = ttl_days * 86400
         self._root.mkdir(parents=True, exist_ok=True)
+        self._memory_limit = memory_bytes
+        self._memory: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._memory_used = 0
+        self._stats = {
+            "memory_hits": 0,
+            "memory_evictions": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "disk_expired": 0,
+        }
 
     def _path(self, key: str) -> Path:
-        bucket = self._root / key[:2]
-        bucket.mkdir(exist_ok=True)
-        return bucket / f"{key}.wav"
+        # key is "<sha256>.<variant>", e.g. "ab12….wav" or "ab12….mp3-128k"
+        return self._root / key[:2] / key
+
+    def stats(self) -> dict:
+        """Hit, miss and eviction counters per tier."""
+        return {
+            **self._stats,
+            "memory_bytes": self._memory_used,
+            "memory_entries": len(self._memory),
+        }
+
+    @staticmethod
+    def key(engine_id: str, voice: str, text: str, variant: str = "wav") -> str:
+        """Addressable cache key: ``<sha256>.<variant>``."""
+        return f"{_cache_key(engine_id, voice, text)}.{variant}"
+
+    async def get(
+        self, engine_id: str, voice: str, text: str, variant: str = "wav"
+    ) -> bytes | None:
+        return await self.get_by_key(self.key(engine_id, voice, text, variant))
+
+    async def get_by_key(self, key: str) -> bytes | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            audio, stored_at = entry
+            if time.time() - stored_at <= self._ttl_seconds:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return audio
+            self._memory_drop(key)
+
+        found = await asyncio.to_thread(self._read_disk, key)
+        if found is None:
+            self._stats["disk_misses"] += 1
+            return None
+        audio, stored_at = found
+        self._stats["disk_hits"] += 1
+        self._memory_put(key, audio, stored_at)
+        return audio
+
+    async def put(
+        self, engine_id: str, voice: str, text: str, audio: bytes, variant: str = "wav"
+    ) -> None:
+        """Store audio; ``variant`` names an encoded form such as ``mp3-128k``."""
+        await self.put_by_key(self.key(engine_id, voice, text, variant), audio)
 
-    def get(self, engine_id: str, voice: str, text: str) -> bytes | None:
-        key = _cache_key(engine_id, voice, text)
+    async def put_by_key(self, key: str, audio: bytes, memory: bool = True) -> None:
+        """Store audio under ``key``; ``memory`` false writes it to disk only."""
+        if memory:
+            self._memory_put(key, audio, time.time())
+        await asyncio.to_thread(self._write_disk, key, audio)
+
+    async def file(self, key: str) -> tuple[Path, os.stat_result] | None:
+        """Disk location and stat of an entry, for serving it straight from the file."""
+        found = await asyncio.to_thread(self._stat_disk, key)
+        if found is None:
+            self._stats["disk_misses"] += 1
+            return None
+        self._stats["disk_hits"] += 1
+        return found
+
+    async def contains(self, key: str) -> bool:
+        """Whether an unexpired entry exists, without counting a hit or miss."""
+        return key in self._memory or await asyncio.to_thread(self._stat_disk, key) is not None
+
+    def _stat_disk(self, key: str) -> tuple[Path, os.stat_result] | None:
         path = self._path(key)
-        if not path.exists():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
             return None
-        age = time.time() - path.stat().st_mtime
-        if age > self._ttl_seconds:
+        if time.time() - stat.st_mtime > self._ttl_seconds:
             path.unlink(missing_ok=True)
+            self._stats["disk_expired"] += 1
             logger.debug("Cache expired: %s", key[:12])
             return None
+        return path, stat
+
+    def _read_disk(self, key: str) -> tuple[bytes, float] | None:
+        found = self._stat_disk(key)
+        if found is None:
+            return None
+        path, stat = found
         logger.debug("Cache hit: %s", key[:12])
-        return path.read_bytes()
+        try:
+            return path.read_bytes(), stat.st_mtime
+        except FileNotFoundError:
+            return None
 
-    def put(self, engine_id: str, voice: str, text: str, audio: bytes) -> None:
-        key = _cache_key(engine_id, voice, text)
+    def _write_disk(self, key: str, audio: bytes) -> None:
         path = self._path(key)
-        path.write_bytes(audio)
+        path.parent.mkdir(exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        tmp = path.with_name(f"{key}.{os.getpid()}.{id(audio)}.tmp")
+        tmp.write_bytes(audio)
+        tmp.replace(path)
         logger.debug("Cache stored: %s (%d bytes)", key[:12], len(audio))
+
+    def _memory_put(self, key: str, audio: bytes, stored_at: float) -> None:
+        if len(audio) > self._memory_limit:
+            return
+        self._memory_drop(key)
+        self._memory[key] = (audio, stored_at)
+        self._memory_used += len(audio)
+        while self._memory_used > self._memory_limit:
+            oldest, _ = next(iter(self._memory.items()))
+            self._memory_drop(oldest)
+            self._stats["memory_evictions"] += 1
+
+    def _memory_drop(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_used -= len(entry[0])
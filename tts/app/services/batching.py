@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent submissions into batches for a batch-capable model.
+
+    A batch is closed when ``max_batch`` items are waiting or ``window_ms``
+    has passed since its first item arrived. Batches run one at a time; each
+    caller gets the result at its own position. If the batch function raises,
+    or returns the wrong number of results, every caller in that batch gets an
+    exception; so does every waiting caller when the batcher is closed.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[T]], Awaitable[list[R]]],
+        window_ms: float = 50,
+        max_batch: int = 4,
+    ) -> None:
+        self._run_batch = run_batch
+        self._window = window_ms / 1000
+        self._max_batch = max(1, max_batch)
+        self._queue: asyncio.Queue[tuple[T, asyncio.Future[R]]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+        # The batch being collected or run, failed on close with the queued ones
+        self._batch: list[tuple[T, asyncio.Future[R]]] = []
+
+    async def submit(self, item: T) -> R:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._loop())
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def pending(self) -> int:
+        """Number of submissions waiting for a batch."""
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """Stop the batching loop and fail every caller still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        waiting = self._batch
+        self._batch = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        error = RuntimeError("Batcher closed")
+        for _, fut in waiting:
+            if not fut.done():
+                fut.set_exception(error)
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._batch = [await self._queue.get()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up while waiting do not need inference
+            batch = self._batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            logger.debug("Running batch of %d", len(batch))
+            try:
+                results = await self._run_batch([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"Batch of {len(batch)} items returned {len(results)} results"
+                    )
+            except Exception as exc:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            finally:
+                self._batch = []
+            for (_, fut), result in zip(batch, results, strict=True):
+                if not fut.done():
+                    fut.set_result(result)
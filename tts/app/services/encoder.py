@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from app.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg; codecs=opus",
+}
+
+
+class AudioEncoder:
+    """Non-blocking ffmpeg encoder with a bounded number of concurrent processes.
+
+    ``opus`` produces Ogg/Opus at 48 kHz mono with the VoIP profile, the format
+    WhatsApp uses for voice notes.
+    """
+
+    def __init__(
+        self, workers: int = 2, mp3_bitrate: str = "128k", opus_bitrate: str = "24k"
+    ) -> None:
+        self._slots = asyncio.Semaphore(workers)
+        self._bitrates = {"mp3": mp3_bitrate, "opus": opus_bitrate}
+
+    def variant(self, fmt: str) -> str:
+        """Cache variant name for a format, e.g. ``mp3-128k``."""
+        if fmt == "wav":
+            return "wav"
+        return f"{fmt}-{self._bitrates[fmt]}"
+
+    def _output_args(self, fmt: str) -> list[str]:
+        if fmt == "mp3":
+            return ["-f", "mp3", "-ab", self._bitrates["mp3"], "-ac", "1"]
+        if fmt == "opus":
+            return [
+                "-c:a", "libopus", "-b:a", self._bitrates["opus"],
+                "-application", "voip", "-ac", "1", "-ar", "48000", "-f", "ogg",
+            ]
+        raise ValueError(f"unsupported output format: {fmt}")
+
+    async def encode(self, wav_bytes: bytes, fmt: str) -> bytes:
+        """Convert WAV audio to ``fmt`` using ffmpeg."""
+        if fmt == "wav":
+            return wav_bytes
+        args = self._output_args(fmt)
+        async with self._slots:
+            with stage(f"encode_{fmt}"):
+                proc = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-loglevel", "error", "-i", "pipe:0", *args, "pipe:1",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                try:
+                    out, err = await proc.communicate(input=wav_bytes)
+                finally:
+                    # A cancelled caller must not leave ffmpeg running
+                    if proc.returncode is None:
+                        proc.kill()
+                        await proc.wait()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg conversion failed: {err.decode(errors='replace')[-200:]}")
+        return out
+
+    async def encode_stream(
+        self, chunks: AsyncIterator[bytes], sample_rate: int, fmt: str
+    ) -> AsyncIterator[bytes]:
+        """Encode a 16-bit mono PCM stream on the fly.
+
+        Streams are long-lived, so they do not take one of the bounded slots.
+        """
+        args = self._output_args(fmt)
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            *args, "-flush_packets", "1", "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        async def feed() -> None:
+            try:
+                async for pcm in chunks:
+                    proc.stdin.write(pcm)
+                    await proc.stdin.drain()
+            finally:
+                proc.stdin.close()
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while data := await proc.stdout.read(16384):
+                yield data
+            await feeder
+        finally:
+            feeder.cancel()
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
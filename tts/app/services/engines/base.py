@@ -1,9 +1,28 @@
+import re
+import unicodedata
 from abc import ABC, abstractmethod
 
+_RE_SPACE_BEFORE_PUNCT = re.compile(r"\s+(?=[.,!?;:…])")
+
 
 class TTSEngine(ABC):
     """Abstract interface for all TTS engines."""
 
+    def normalize(self, text: str) -> str:
+        """Canonical form of text for this engine, applied before cache lookup.
+
+        Texts that normalize to the same string must sound the same, so they
+        can share one cache entry. The default drops emoji and other symbols
+        and collapses whitespace.
+        """
+        text = unicodedata.normalize("NFC", text)
+        text = "".join(ch for ch in text if unicodedata.category(ch) not in ("So", "Cs", "Co"))
+        return _RE_SPACE_BEFORE_PUNCT.sub("", " ".join(text.split()))
+
+    def voices(self) -> list[dict]:
+        """Voices this engine offers, with their residency; empty if it has none."""
+        return []
+
     @abstractmethod
     async def synthesize(self, text: str, voice: str = "default") -> bytes:
         """Generate WAV audio bytes from text."""
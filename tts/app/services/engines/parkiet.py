@@ -4,23 +4,37 @@ import logging
 import re
 import time
 import wave
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
 from num2words import num2words
 
+from app.metrics import MODEL_LOAD_SECONDS
+from app.services.audio import crossfade_wavs
+from app.services.batching import MicroBatcher
 from app.services.engines.base import TTSEngine
+from app.services.text import chunk_text
 
 logger = logging.getLogger(__name__)
 
 PARKIET_MODEL = "pevers/parkiet"
-IDLE_UNLOAD_SECONDS = 300  # unload model after 5 min of inactivity
 
-# Regex patterns for text normalization
-_RE_URL = re.compile(r"https?://\S+", re.IGNORECASE)
-_RE_EMAIL = re.compile(r"\S+@\S+\.\S+")
-_RE_ABBREV = re.compile(r"\b([A-Z]{2,})\b")
-_RE_NUMBER = re.compile(r"\b\d+([.,]\d+)?\b")
-_RE_SPECIAL = re.compile(r"[^\w\s.,!?;:'\-()…]")
+# Single-pass tokenizer for text normalization: one regex finds every token
+# that needs rewriting; everything else is copied through by re.sub in C.
+# Alternatives are tried in order, so URLs and e-mail addresses win.
+_RE_TOKEN = re.compile(
+    r"""
+    (?P<tag>\[S\d\])
+  | (?P<url>(?i:https?)://\S+)
+  | (?P<email>(?<!\S)[^\s@]+@\S+\.\S+)
+  | (?P<abbrev>\b[A-Z]{2,}\b)
+  | (?P<number>\b\d+(?:[.,]\d+)?\b)
+  | (?P<drop>[^\w\s.,!?;:'\-()…]+)
+    """,
+    re.VERBOSE,
+)
+_NORMALIZE_MEMO_SIZE = 4096
 
 
 # Dutch phonetic letter names for spelling out abbreviations
@@ -34,14 +48,13 @@ _LETTER_NAMES = {
 }
 
 
-def _expand_abbreviation(m: re.Match) -> str:
+def _expand_abbreviation(abbrev: str) -> str:
     """Spell out uppercase abbreviations phonetically: PZC -> pee zet cee."""
-    return " ".join(_LETTER_NAMES.get(ch, ch.lower()) for ch in m.group(1))
+    return " ".join(_LETTER_NAMES.get(ch, ch.lower()) for ch in abbrev)
 
 
-def _number_to_words(m: re.Match) -> str:
+def _number_to_words(raw: str) -> str:
     """Convert digits to Dutch words: 2026 -> tweeduizend zesentwintig."""
-    raw = m.group(0)
     try:
         # Handle decimals with comma (Dutch style)
         if "," in raw:
@@ -51,51 +64,67 @@ def _number_to_words(m: re.Match) -> str:
         return raw
 
 
+def _rewrite_token(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind == "tag":
+        return m.group()
+    if kind == "url":
+        return "link"
+    if kind == "email":
+        return "e-mailadres"
+    if kind == "abbrev":
+        return _expand_abbreviation(m.group())
+    if kind == "number":
+        return _number_to_words(m.group())
+    return ""  # emoji and other symbols
+
+
+@lru_cache(maxsize=_NORMALIZE_MEMO_SIZE)
 def _normalize_for_parkiet(text: str) -> str:
     """Normalize text for optimal Parkiet Dutch TTS output.
 
     Parkiet expects: lowercase, digits as words, no abbreviations/URLs.
+    Speaker tags ([S1], [S2]) are kept as-is. Results are memoized.
     """
-    # Extract speaker tags before processing
-    tags: list[str] = []
-    def _save_tag(m: re.Match) -> str:
-        tags.append(m.group(0))
-        return f"__TAG{len(tags) - 1}__"
-    text = re.sub(r"\[S\d\]", _save_tag, text)
-
-    # Replace URLs and emails
-    text = _RE_URL.sub("link", text)
-    text = _RE_EMAIL.sub("e-mailadres", text)
-
-    # Expand uppercase abbreviations BEFORE lowercasing (PZC -> p z c)
-    text = _RE_ABBREV.sub(_expand_abbreviation, text)
-
-    # Convert numbers to Dutch words (2026 -> tweeduizend zesentwintig)
-    text = _RE_NUMBER.sub(_number_to_words, text)
-
-    # Lowercase everything
-    text = text.lower()
-
-    # Remove special characters (emoji, etc.) but keep basic punctuation
-    text = _RE_SPECIAL.sub("", text)
+    text = _RE_TOKEN.sub(_rewrite_token, text).lower()
+    # "[" only survives as part of a speaker tag, so this restores exactly the tags
+    text = text.replace("[s", "[S")
+    return " ".join(text.split())
 
-    # Collapse multiple spaces
-    text = re.sub(r"\s+", " ", text).strip()
 
-    # Restore speaker tags
-    for i, tag in enumerate(tags):
-        text = text.replace(f"__tag{i}__", tag)
-
-    return text
+class ParkietEngine(TTSEngine):
+    """TTS via Parkiet — high quality Dutch, GPU-based, lazy loaded.
 
+    Concurrent requests are micro-batched: they are collected for up to
+    ``batch_window_ms`` (or until ``max_batch`` are waiting) and run through
+    the pipeline in one forward pass. ``pipeline_factory`` replaces the
+    transformers pipeline, e.g. with a CPU stub for benchmarks.
 
-class ParkietEngine(TTSEngine):
-    """TTS via Parkiet — high quality Dutch, GPU-based, lazy loaded."""
+    Sentences longer than ``max_chunk_chars`` are split at clause or word
+    boundaries. The chunks go through the batcher concurrently and the
+    audio is joined with a ``crossfade_ms`` crossfade.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        batch_window_ms: float = 50,
+        max_batch: int = 4,
+        max_chunk_chars: int = 300,
+        crossfade_ms: int = 40,
+        pipeline_factory: Callable[[], Any] | None = None,
+    ) -> None:
         self._pipeline: Any = None
+        self._pipeline_factory = pipeline_factory
+        self._max_chunk_chars = max_chunk_chars
+        self._crossfade_ms = crossfade_ms
         self._last_used: float = 0.0
+        self._memory_bytes = 0
+        self.load_ms: int | None = None    # duration of the last model load
+        self.unload_ms: int | None = None  # duration of the last unload
         self._lock = asyncio.Lock()
+        self._batcher: MicroBatcher[str, bytes] = MicroBatcher(
+            self._synthesize_batch, window_ms=batch_window_ms, max_batch=max_batch
+        )
 
     @property
     def engine_id(self) -> str:
@@ -110,60 +139,123 @@ class ParkietEngine(TTSEngine):
         return "slow"
 
     def is_available(self) -> bool:
+        if self._pipeline_factory is not None:
+            return True
         try:
             import torch
             return torch.cuda.is_available()
         except ImportError:
             return False
 
+    @property
+    def is_loaded(self) -> bool:
+        return self._pipeline is not None
+
+    @property
+    def last_used(self) -> float:
+        """``time.monotonic()`` of the last inference, 0 if never used."""
+        return self._last_used
+
+    def memory_bytes(self) -> int:
+        """Parameter memory of the loaded model (0 when unloaded)."""
+        return self._memory_bytes if self._pipeline is not None else 0
+
+    async def load(self) -> None:
+        """Load the model now instead of on the first request."""
+        async with self._lock:
+            await asyncio.to_thread(self._ensure_loaded)
+
+    def normalize(self, text: str) -> str:
+        return _normalize_for_parkiet(text)
+
     async def synthesize(self, text: str, voice: str = "default") -> bytes:
+        # The service passes normalized text; normalizing again is a memoized no-op
+        chunks = [_normalize_for_parkiet(c) for c in chunk_text(text, self._max_chunk_chars)]
+        chunks = [c for c in chunks if c.split("]", 1)[-1].strip()]
+        if not chunks:
+            raise ValueError("text contains nothing to synthesize")
+        logger.debug("Parkiet input (%d chunks): %s", len(chunks), chunks[0][:200])
+        wavs = await asyncio.gather(*(self._batcher.submit(c) for c in chunks))
+        return crossfade_wavs(list(wavs), self._crossfade_ms)
+
+    async def _synthesize_batch(self, texts: list[str]) -> list[bytes]:
         async with self._lock:
             await asyncio.to_thread(self._ensure_loaded)
-            text = _normalize_for_parkiet(text)
-            if not text.lstrip().startswith("[S"):
-                text = f"[S1] {text}"
-            logger.debug("Parkiet input: %s", text[:200])
-            wav_bytes = await asyncio.to_thread(self._run_inference, text)
+            wavs = await asyncio.to_thread(self._run_inference, texts)
             self._last_used = time.monotonic()
-            return wav_bytes
+            return wavs
 
     def _ensure_loaded(self) -> None:
         if self._pipeline is not None:
             return
+        t0 = time.monotonic()
+        self._pipeline = self._create_pipeline()
+        self.load_ms = int((time.monotonic() - t0) * 1000)
+        MODEL_LOAD_SECONDS.labels(self.engine_id).observe(self.load_ms / 1000)
+        self._memory_bytes = _model_memory_bytes(self._pipeline)
+        logger.info(
+            "Parkiet model loaded in %d ms (%.0f MB)", self.load_ms, self._memory_bytes / 2**20
+        )
+
+    def _create_pipeline(self) -> Any:
+        if self._pipeline_factory is not None:
+            return self._pipeline_factory()
         logger.info("Loading Parkiet model from %s ...", PARKIET_MODEL)
         try:
             import torch
             from transformers import pipeline as hf_pipeline
 
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            self._pipeline = hf_pipeline(
+            pipeline = hf_pipeline(
                 "text-to-speech",
                 model=PARKIET_MODEL,
                 torch_dtype=torch.bfloat16,
                 device=device,
             )
             logger.info("Parkiet model loaded on %s", device)
+            return pipeline
         except Exception as exc:
             logger.error("Failed to load Parkiet: %s", exc)
             raise RuntimeError("Parkiet model kon niet geladen worden") from exc
 
-    def _run_inference(self, text: str) -> bytes:
-        result = self._pipeline(text)
+    def _run_inference(self, texts: list[str]) -> list[bytes]:
+        results = self._pipeline(texts, batch_size=len(texts))
+        # A single input may come back as a bare dict instead of a list
+        if isinstance(results, dict):
+            results = [results]
         # result["audio"] is a numpy array; result["sampling_rate"] is the rate
-        audio_array = result["audio"]
-        sample_rate = result["sampling_rate"]
-        return _numpy_to_wav(audio_array, sample_rate)
+        return [_numpy_to_wav(r["audio"], r["sampling_rate"]) for r in results]
 
-    def unload(self) -> None:
-        """Release GPU memory."""
-        if self._pipeline is not None:
+    def queue_depth(self) -> int:
+        """Chunks waiting for the next batch."""
+        return self._batcher.pending()
+
+    def close(self) -> None:
+        """Stop the batching loop."""
+        self._batcher.close()
+
+    async def unload(self) -> None:
+        """Release GPU memory; waits for a running batch to finish."""
+        async with self._lock:
+            if self._pipeline is None:
+                return
             logger.info("Unloading Parkiet model to free VRAM")
+            t0 = time.monotonic()
             self._pipeline = None
             try:
                 import torch
                 torch.cuda.empty_cache()
             except ImportError:
                 pass
+            self.unload_ms = int((time.monotonic() - t0) * 1000)
+
+
+def _model_memory_bytes(pipeline: Any) -> int:
+    """Sum of parameter sizes of a transformers pipeline's model, if it has one."""
+    model = getattr(pipeline, "model", None)
+    if model is None or not hasattr(model, "parameters"):
+        return 0
+    return sum(p.numel() * p.element_size() for p in model.parameters())
 
 
 def _numpy_to_wav(audio: Any, sample_rate: int) -> bytes:
@@ -1,21 +1,63 @@
 import asyncio
-import io
 import logging
-import wave
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
 
+from app.metrics import MODEL_LOAD_SECONDS
+from app.services.audio import pcm_to_wav
 from app.services.engines.base import TTSEngine
+from app.services.voices import VoiceRegistry
 
 logger = logging.getLogger(__name__)
 
-# Piper outputs 22050 Hz mono 16-bit PCM; we wrap it in a WAV container
-PIPER_SAMPLE_RATE = 22050
+# Per-process state of a pool worker: loaded voices by model path
+_worker_voices: dict[str, Any] = {}
+
+
+def _load_voice(model_path: str) -> Any:
+    from piper import PiperVoice
+
+    _worker_voices[model_path] = PiperVoice.load(model_path)
+    return _worker_voices[model_path]
+
+
+def _init_worker(model_paths: tuple[str, ...]) -> None:
+    """Load the resident voices once per worker process."""
+    for model_path in model_paths:
+        _load_voice(model_path)
+
+
+def _synthesize_in_worker(
+    text: str, model_path: str, resident: tuple[str, ...]
+) -> tuple[bytes, int]:
+    """Synthesize text with a voice, loading it on first use: returns (PCM, sample rate).
+
+    Voices outside ``resident`` are dropped first, so a worker never holds
+    more than the parent's resident set plus the requested voice.
+    """
+    for path in [p for p in _worker_voices if p not in resident and p != model_path]:
+        del _worker_voices[path]
+    voice = _worker_voices.get(model_path) or _load_voice(model_path)
+    pcm = b"".join(chunk.audio_int16_bytes for chunk in voice.synthesize(text))
+    return pcm, voice.config.sample_rate
 
 
 class PiperEngine(TTSEngine):
-    """TTS via Piper — fast, CPU-only, Dutch voice (nl_BE-nathalie-medium)."""
+    """TTS via Piper — fast, CPU-only, any voice in the models directory.
 
-    def __init__(self, model_path: str) -> None:
-        self._model_path = model_path
+    With ``workers > 0`` synthesis runs in a pool of long-lived processes
+    that keep the registry's resident voices loaded; other voices are loaded
+    on first use. ``workers=0`` keeps the legacy behaviour of one ``piper``
+    subprocess per request.
+    """
+
+    def __init__(self, voices: VoiceRegistry, workers: int = 2) -> None:
+        self._voices = voices
+        self._workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = asyncio.Lock()
 
     @property
     def engine_id(self) -> str:
@@ -32,11 +74,100 @@ class PiperEngine(TTSEngine):
     def is_available(self) -> bool:
         return True  # CPU-based, always available
 
+    def voices(self) -> list[dict]:
+        return self._voices.status()
+
+    def voice_id(self, voice: str) -> str:
+        """ID of a voice, with "default" resolved; raises ValueError for an unknown one."""
+        return self._voices.get(voice).id
+
+    async def find_voice(self, voice: str) -> str:
+        """Like ``voice_id``, but picks up voices added to the models directory."""
+        return (await self._voices.find(voice)).id
+
     async def synthesize(self, text: str, voice: str = "default") -> bytes:
+        if self._workers <= 0:
+            return await self._synthesize_subprocess(text, voice)
+        return await self._synthesize_pooled(text, voice)
+
+    async def start(self) -> None:
+        """Spawn the worker pool and load the default voice in every worker.
+
+        Raises RuntimeError if the default voice is missing or the workers
+        cannot load it.
+        """
+        await self._voices.scan()
+        default = self._voices.default
+        if default is None:
+            raise RuntimeError("Default Piper voice not found; check TTS_PIPER_MODEL")
+        if self._workers <= 0:
+            return
+        self._voices.use(default)
+        t0 = time.monotonic()
+        pool = await self._get_pool()
+        # Touch every worker so model loading happens now instead of on first request
+        try:
+            await asyncio.gather(
+                *(asyncio.wrap_future(pool.submit(int, 0)) for _ in range(self._workers))
+            )
+        except BrokenProcessPool as exc:
+            # Fail startup: a pool that cannot load the default voice serves nothing
+            self.close()
+            raise RuntimeError(f"Piper workers failed to load {default.model_path}") from exc
+        MODEL_LOAD_SECONDS.labels(self.engine_id).observe(time.monotonic() - t0)
+        logger.info("Piper worker pool started (%d workers)", self._workers)
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _get_pool(self) -> ProcessPoolExecutor:
+        async with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    initializer=_init_worker,
+                    initargs=(self._voices.resident_paths(),),
+                )
+            return self._pool
+
+    async def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        async with self._pool_lock:
+            # Another caller may already have replaced the broken pool
+            if self._pool is broken:
+                logger.warning("Piper worker crashed, restarting worker pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _synthesize_pooled(self, text: str, voice: str) -> bytes:
+        """Run synthesis in a resident worker; retry once if a worker died."""
+        selected = self._voices.get(voice)
+        resident = self._voices.use(selected)
+        for attempt in range(2):
+            pool = await self._get_pool()
+            try:
+                pcm, sample_rate = await asyncio.wrap_future(
+                    pool.submit(_synthesize_in_worker, text, selected.model_path, resident)
+                )
+                return pcm_to_wav(pcm, sample_rate)
+            except BrokenProcessPool as exc:
+                await self._restart_pool(pool)
+                if attempt:
+                    raise RuntimeError("Piper worker pool crashed") from exc
+            except Exception as exc:
+                logger.error("piper error: %s", exc)
+                self._voices.discard(selected)
+                raise RuntimeError(f"Piper synthesis failed: {exc}") from exc
+        raise RuntimeError("Piper worker pool crashed")
+
+    async def _synthesize_subprocess(self, text: str, voice: str) -> bytes:
         """Run piper as subprocess: text → stdin, raw PCM → stdout."""
+        selected = self._voices.get(voice)
         proc = await asyncio.create_subprocess_exec(
             "piper",
-            "--model", self._model_path,
+            "--model", selected.model_path,
             "--output_raw",
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
@@ -49,15 +180,5 @@ class PiperEngine(TTSEngine):
             logger.error("piper error: %s", err)
             raise RuntimeError(f"Piper synthesis failed: {err}")
 
-        return _pcm_to_wav(pcm_bytes, PIPER_SAMPLE_RATE)
-
+        return pcm_to_wav(pcm_bytes, selected.sample_rate)
 
-def _pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
-    """Wrap raw 16-bit mono PCM in a WAV container."""
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # 16-bit
-        wf.setframerate(sample_rate)
-        wf.writeframes(pcm)
-    return buf.getvalue()
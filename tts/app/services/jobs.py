@@ -0,0 +1,210 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from app.services.tts_service import TTSService
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+@dataclass
+class Job:
+    id: str
+    text: str
+    engine: str
+    voice: str
+    output_format: str
+    priority: str
+    status: str = "queued"         # "queued" | "running" | "done" | "failed"
+    created_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+    audio_id: str | None = None
+    engine_used: str | None = None
+    cached: bool | None = None
+    error: str | None = None
+    error_status: int | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class JobQueue:
+    """Persistent synthesis job queue served by a fixed set of workers.
+
+    Jobs wait in a priority queue, so queued interactive jobs always run before
+    queued batch jobs (FIFO within a class). Each job is stored as JSON under
+    ``jobs_dir``; on startup unfinished jobs are queued again. Results are
+    published to the audio cache and fetched by their audio ID.
+    """
+
+    def __init__(
+        self,
+        tts: TTSService,
+        jobs_dir: str,
+        workers: int = 1,
+        retention_hours: float = 24,
+    ) -> None:
+        self._tts = tts
+        self._root = Path(jobs_dir)
+        self._workers = max(1, workers)
+        self._retention_seconds = retention_hours * 3600
+        self._jobs: dict[str, Job] = {}
+        self._events: dict[str, asyncio.Event] = {}
+        self._queue: asyncio.PriorityQueue[tuple[int, int, str]] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Load persisted jobs, requeue unfinished ones and start the workers."""
+        jobs = await asyncio.to_thread(self._load_all)
+        for job in sorted(jobs, key=lambda j: j.created_at):
+            self._jobs[job.id] = job
+            self._events[job.id] = asyncio.Event()
+            if job.finished:
+                self._events[job.id].set()
+                continue
+            # A job that was running when the service stopped starts over
+            job.status, job.started_at = "queued", None
+            self._enqueue(job)
+        if self._queue.qsize():
+            logger.info("Requeued %d unfinished TTS jobs", self._queue.qsize())
+        await self._prune()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def depth(self) -> dict[str, int]:
+        """Number of queued jobs per priority class."""
+        counts = dict.fromkeys(PRIORITIES, 0)
+        for job in self._jobs.values():
+            if job.status == "queued":
+                counts[job.priority] += 1
+        return counts
+
+    async def submit(
+        self,
+        text: str,
+        engine: str = "auto",
+        voice: str = "default",
+        output_format: str = "wav",
+        priority: str = "batch",
+    ) -> Job:
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {set(PRIORITIES)}")
+        job = Job(
+            id=uuid.uuid4().hex,
+            text=text,
+            engine=engine,
+            voice=voice,
+            output_format=output_format,
+            priority=priority,
+            created_at=time.time(),
+        )
+        self._jobs[job.id] = job
+        self._events[job.id] = asyncio.Event()
+        await self._save(job)
+        self._enqueue(job)
+        await self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """Return the job once it is finished or ``timeout`` seconds have passed."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(self._events[job_id].wait(), timeout)
+        except TimeoutError:
+            pass
+        return job
+
+    def _enqueue(self, job: Job) -> None:
+        self._queue.put_nowait((PRIORITIES[job.priority], next(self._seq), job.id))
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                continue
+            job.status, job.started_at = "running", time.time()
+            await self._save(job)
+            try:
+                result = await self._tts.synthesize(
+                    job.text, job.engine, job.voice, job.output_format, load=False
+                )
+                job.audio_id = await self._tts.publish(result, job.text, job.voice)
+                job.engine_used, job.cached = result.engine_used, result.cached
+                job.status = "done"
+            except asyncio.CancelledError:
+                raise
+            except ValueError as exc:
+                job.status, job.error, job.error_status = "failed", str(exc), 400
+            except RuntimeError:
+                logger.exception("TTS job %s failed", job.id)
+                job.status, job.error, job.error_status = "failed", "TTS synthese mislukt", 503
+            except Exception:
+                logger.exception("TTS job %s failed", job.id)
+                job.status, job.error, job.error_status = "failed", "Interne fout", 500
+            job.finished_at = time.time()
+            # The text is only needed to run the job; don't keep it on disk afterwards
+            job.text = ""
+            await self._save(job)
+            self._events[job.id].set()
+
+    async def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self._retention_seconds
+        expired = [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+            del self._events[job_id]
+        if expired:
+            await asyncio.to_thread(self._delete, expired)
+
+    def _path(self, job_id: str) -> Path:
+        return self._root / f"{job_id}.json"
+
+    async def _save(self, job: Job) -> None:
+        await asyncio.to_thread(self._write, job)
+
+    def _write(self, job: Job) -> None:
+        self._root.mkdir(parents=True, exist_ok=True)
+        path = self._path(job.id)
+        # Write-then-rename so a crash never leaves a truncated job file
+        tmp = path.with_name(f"{job.id}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(asdict(job)))
+        tmp.replace(path)
+
+    def _delete(self, job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            self._path(job_id).unlink(missing_ok=True)
+
+    def _load_all(self) -> list[Job]:
+        if not self._root.is_dir():
+            return []
+        jobs = []
+        for path in self._root.glob("*.json"):
+            try:
+                jobs.append(Job(**json.loads(path.read_text())))
+            except (OSError, ValueError, TypeError):
+                logger.warning("Skipping unreadable job file %s", path.name)
+        return jobs
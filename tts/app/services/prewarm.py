@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from app.services.access_log import AccessLog, Request
+from app.services.tts_service import TTSService
+
+logger = logging.getLogger(__name__)
+
+
+class CachePrewarmer:
+    """Fills the audio cache in the background from a phrase file and access history.
+
+    Phrases come one per line from ``phrases_file`` (blank lines and lines
+    starting with ``#`` are skipped) and are prewarmed in every format of
+    ``formats``; after them come the ``top_requests`` most requested items
+    of the access log. Work runs one item at a time, only while no other
+    synthesis is in flight, and pauses ``interval_ms`` after every item that
+    needed the engine, so live traffic never waits behind it.
+    """
+
+    def __init__(
+        self,
+        tts: TTSService,
+        access_log: AccessLog,
+        phrases_file: str = "",
+        formats: list[str] | None = None,
+        top_requests: int = 200,
+        interval_ms: int = 250,
+        save_interval: float = 60,
+    ) -> None:
+        self._tts = tts
+        self._access_log = access_log
+        self._phrases_file = phrases_file
+        self._formats = formats or ["wav"]
+        self._top_requests = top_requests
+        self._interval = interval_ms / 1000
+        self._save_interval = save_interval
+        self._tasks: list[asyncio.Task] = []
+        self._progress = {
+            "state": "idle",               # "idle" | "running" | "done"
+            "total": 0,
+            "from_phrases": 0,
+            "from_history": 0,
+            "completed": 0,
+            "already_cached": 0,
+            "synthesized": 0,
+            "failed": 0,
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    async def start(self, prewarm: bool = True) -> None:
+        """Load the access log and start saving it; start a prewarm run if ``prewarm``."""
+        await self._access_log.load()
+        self._tasks.append(asyncio.create_task(self._save_loop()))
+        if prewarm:
+            self._tasks.append(asyncio.create_task(self._run()))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self._access_log.save()
+
+    def progress(self) -> dict:
+        done = self._progress["already_cached"] + self._progress["synthesized"]
+        total = self._progress["total"]
+        return {
+            **self._progress,
+            # Fraction of the prewarm set known to be in the cache
+            "coverage": round(done / total, 4) if total else 0.0,
+        }
+
+    def _read_phrases(self) -> list[str]:
+        if not self._phrases_file:
+            return []
+        try:
+            lines = Path(self._phrases_file).read_text(encoding="utf-8").splitlines()
+        except OSError:
+            logger.warning("Cannot read prewarm phrases from %s", self._phrases_file)
+            return []
+        return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+    async def _collect(self) -> list[Request]:
+        phrases = await asyncio.to_thread(self._read_phrases)
+        items = [("auto", "default", p, fmt) for p in phrases for fmt in self._formats]
+        seen = set(items)
+        history = [r for r in self._access_log.top(self._top_requests) if r not in seen]
+        self._progress["from_phrases"] = len(items)
+        self._progress["from_history"] = len(history)
+        return items + history
+
+    async def _run(self) -> None:
+        items = await self._collect()
+        self._progress.update(state="running", total=len(items), started_at=time.time())
+        logger.info("Prewarming audio cache with %d items", len(items))
+        for engine, voice, text, output_format in items:
+            while self._tts.busy():
+                await asyncio.sleep(self._interval or 0.05)
+            try:
+                result = await self._tts.synthesize(
+                    text, engine, voice, output_format, record_access=False, load=False
+                )
+            except (ValueError, RuntimeError) as exc:
+                logger.warning("Prewarm of %r failed: %s", text[:40], exc)
+                self._progress["failed"] += 1
+            else:
+                key = "already_cached" if result.cached else "synthesized"
+                self._progress[key] += 1
+                if not result.cached:
+                    await asyncio.sleep(self._interval)
+            self._progress["completed"] += 1
+        self._progress.update(state="done", finished_at=time.time())
+        logger.info(
+            "Cache prewarm done: %d synthesized, %d already cached, %d failed",
+            self._progress["synthesized"],
+            self._progress["already_cached"],
+            self._progress["failed"],
+        )
+
+    async def _save_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._save_interval)
+            try:
+                await self._access_log.save()
+            except OSError:
+                logger.exception("Saving the access log failed")
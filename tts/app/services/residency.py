@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class ResidentModel(Protocol):
+    """An engine whose model can be loaded and unloaded on demand."""
+
+    @property
+    def engine_id(self) -> str: ...
+
+    @property
+    def is_loaded(self) -> bool: ...
+
+    @property
+    def last_used(self) -> float: ...
+
+    load_ms: int | None
+    unload_ms: int | None
+
+    def is_available(self) -> bool: ...
+
+    def memory_bytes(self) -> int: ...
+
+    async def load(self) -> None: ...
+
+    async def unload(self) -> None: ...
+
+
+class ResidencyManager:
+    """Decides when large models are loaded and unloaded.
+
+    - Prewarms models in the background at startup and, optionally, at fixed
+      hours of the day (e.g. just before the news briefing runs).
+    - Unloads a model after ``idle_unload_seconds`` without inference.
+    - Keeps the sum of resident model memory under ``memory_budget_bytes``
+      (0 = no limit) by unloading the least recently used models first.
+    """
+
+    def __init__(
+        self,
+        models: list[ResidentModel],
+        idle_unload_seconds: float = 300,
+        memory_budget_bytes: int = 0,
+        prewarm_on_start: bool = True,
+        prewarm_hours: set[int] | None = None,
+        check_interval: float = 30,
+    ) -> None:
+        self._models = {m.engine_id: m for m in models}
+        self._idle_unload = idle_unload_seconds
+        self._budget = memory_budget_bytes
+        self._prewarm_on_start = prewarm_on_start
+        self._prewarm_hours = prewarm_hours or set()
+        self._check_interval = check_interval
+        self._loaded_at: dict[str, float] = {}
+        self._footprint: dict[str, int] = {}  # memory of each model when last seen loaded
+        self._last_prewarm_hour: int | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the background prewarm and idle-check loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "engine": m.engine_id,
+                "loaded": m.is_loaded,
+                "memory_bytes": m.memory_bytes(),
+                "idle_seconds": round(now - m.last_used, 1) if m.last_used else None,
+                "last_load_ms": m.load_ms,
+                "last_unload_ms": m.unload_ms,
+            }
+            for m in self._models.values()
+        ]
+
+    async def prewarm(self, engine_id: str | None = None) -> None:
+        """Load one model (or all available ones), making room in the budget first."""
+        for model in self._models.values():
+            if engine_id and model.engine_id != engine_id:
+                continue
+            if model.is_loaded or not model.is_available():
+                continue
+            await self._make_room(reserve=self._footprint.get(model.engine_id, 0), exclude=model)
+            logger.info("Prewarming %s", model.engine_id)
+            try:
+                await model.load()
+            except RuntimeError:
+                logger.exception("Prewarm of %s failed", model.engine_id)
+                continue
+            self._loaded_at[model.engine_id] = time.monotonic()
+            self._footprint[model.engine_id] = model.memory_bytes()
+
+    async def check(self) -> None:
+        """One pass of the policy: scheduled prewarm, idle unload, memory budget."""
+        hour = datetime.now().hour
+        if hour in self._prewarm_hours and hour != self._last_prewarm_hour:
+            self._last_prewarm_hour = hour
+            await self.prewarm()
+
+        now = time.monotonic()
+        for model in self._models.values():
+            if not model.is_loaded:
+                continue
+            # A prewarmed but never used model idles from its load time
+            since = max(model.last_used, self._loaded_at.get(model.engine_id, 0.0))
+            if not since:
+                # Loaded on demand but never finished an inference: start the clock now
+                self._loaded_at[model.engine_id] = now
+                continue
+            if now - since > self._idle_unload:
+                logger.info("Unloading %s after %.0f s idle", model.engine_id, now - since)
+                await model.unload()
+                self._loaded_at.pop(model.engine_id, None)
+
+        await self._make_room()
+
+    async def _make_room(self, reserve: int = 0, exclude: ResidentModel | None = None) -> None:
+        """Unload least recently used models until ``reserve`` more bytes fit the budget."""
+        if not self._budget:
+            return
+        loaded = [m for m in self._models.values() if m.is_loaded and m is not exclude]
+        for m in loaded:
+            self._footprint[m.engine_id] = m.memory_bytes()
+        used = sum(m.memory_bytes() for m in loaded)
+        for model in sorted(loaded, key=lambda m: m.last_used):
+            if used + reserve <= self._budget:
+                break
+            logger.info("Unloading %s to stay within the model memory budget", model.engine_id)
+            used -= model.memory_bytes()
+            await model.unload()
+            self._loaded_at.pop(model.engine_id, None)
+
+    async def _run(self) -> None:
+        if self._prewarm_on_start:
+            await self.prewarm()
+        while True:
+            await asyncio.sleep(self._check_interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Residency check failed")
@@ -0,0 +1,71 @@
+import re
+
+# Sentence end: terminal punctuation followed by whitespace and an uppercase
+# letter, digit or quote. Lowercase continuations ("o.a. de", "dhr. jansen")
+# are treated as abbreviations and do not split.
+_RE_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+(?=[\"'“‘(\[]?[A-Z0-9À-Ý])|\n\s*\n")
+_RE_SPEAKER_TAG = re.compile(r"\[S\d\]")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences for pipelined synthesis.
+
+    Speaker tags ([S1], [S2], ...) are carried over: every sentence that
+    follows a tag is prefixed with that tag, so each piece can be synthesized
+    on its own with the right speaker.
+    """
+    tags = _RE_SPEAKER_TAG.findall(text)
+    parts = _RE_SPEAKER_TAG.split(text)
+    # parts[0] is the text before the first tag (usually empty)
+    segments = [("", parts[0])] + list(zip(tags, parts[1:]))
+
+    sentences: list[str] = []
+    for tag, segment in segments:
+        for sentence in _RE_SENTENCE_END.split(segment):
+            sentence = " ".join(sentence.split())
+            if sentence:
+                sentences.append(f"{tag} {sentence}" if tag else sentence)
+    return sentences
+
+
+def has_speech(text: str) -> bool:
+    """Whether text has anything to pronounce besides speaker tags and symbols."""
+    return any(ch.isalnum() for ch in _RE_SPEAKER_TAG.sub("", text))
+
+
+def chunk_text(text: str, max_chars: int) -> list[str]:
+    """Split one sentence into chunks of at most ``max_chars`` characters.
+
+    The service hands engines one normalized sentence at a time, so only
+    sentences longer than ``max_chars`` need splitting: at commas or,
+    failing that, at word boundaries. Every chunk starts with the sentence's
+    speaker tag ([S1] when it has none).
+    """
+    tag, body = _split_tag(" ".join(text.split()))
+    return [f"{tag} {piece}" for piece in _split_long(body, max_chars - len(tag) - 1) if piece]
+
+
+def _split_tag(sentence: str) -> tuple[str, str]:
+    m = _RE_SPEAKER_TAG.match(sentence)
+    if m:
+        return m.group(0), sentence[m.end():].strip()
+    return "[S1]", sentence
+
+
+def _split_long(sentence: str, max_chars: int) -> list[str]:
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces: list[str] = []
+    current = ""
+    # Prefer clause boundaries, fall back to words
+    for part in re.split(r"(?<=[,;:])\s+", sentence):
+        words = [part] if len(part) <= max_chars else part.split()
+        for word in words:
+            if current and len(current) + 1 + len(word) > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
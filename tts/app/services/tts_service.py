@@ -1,11 +1,20 @@
+import asyncio
 import logging
+import os
 import time
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from dataclasses import dataclass, replace
+from pathlib import Path
 
+from app.metrics import SYNTHESIS_SECONDS, observe_realtime, stage, timed
+from app.services.audio import concat_wavs, resample_pcm, wav_duration, wav_to_pcm
+from app.services.access_log import AccessLog
 from app.services.audio_cache import AudioCache
+from app.services.encoder import AudioEncoder
 from app.services.engines.base import TTSEngine
 from app.services.engines.parkiet import ParkietEngine
 from app.services.engines.piper import PiperEngine
+from app.services.text import has_speech, split_sentences
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +25,12 @@ class SynthesisResult:
     engine_used: str
     cached: bool
     duration_ms: int
+    sentences: int = 1
+    sentences_cached: int = 0
+    format: str = "wav"
+    audio_id: str | None = None  # cache key, when the audio is stored as one entry
+    # Cache file and stat of a result not loaded into memory; ``audio`` is then empty
+    file: tuple[Path, os.stat_result] | None = None
 
 
 class TTSService:
@@ -25,11 +40,26 @@ class TTSService:
         parkiet: ParkietEngine | None,
         cache: AudioCache,
         default_engine: str = "piper",
+        encoder: AudioEncoder | None = None,
+        stream_lookahead: int = 2,
+        sentence_gap_ms: int = 150,
+        access_log: AccessLog | None = None,
     ) -> None:
         self._piper = piper
         self._parkiet = parkiet
         self._cache = cache
         self._default = default_engine
+        self._encoder = encoder or AudioEncoder()
+        self._stream_lookahead = max(1, stream_lookahead)
+        self._sentence_gap_ms = sentence_gap_ms
+        self._sentence_hits = 0
+        self._sentence_misses = 0
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # In-flight sentence task -> number of callers awaiting it
+        self._sentence_waiters: dict[asyncio.Task, int] = {}
+        self._coalesced_requests = 0
+        self._coalesced_sentences = 0
+        self._access_log = access_log
 
     def available_engines(self) -> list[TTSEngine]:
         engines: list[TTSEngine] = []
@@ -39,38 +69,346 @@ class TTSService:
             engines.append(self._parkiet)
         return engines
 
+    @property
+    def encoder(self) -> AudioEncoder:
+        return self._encoder
+
+    def busy(self) -> bool:
+        """True while any synthesis is in flight."""
+        return bool(self._inflight)
+
+    def stats(self) -> dict:
+        """Sentence-level and per-tier cache statistics since startup."""
+        lookups = self._sentence_hits + self._sentence_misses
+        return {
+            "sentence_hits": self._sentence_hits,
+            "sentence_misses": self._sentence_misses,
+            "sentence_hit_rate": round(self._sentence_hits / lookups, 4) if lookups else 0.0,
+            "coalesced_requests": self._coalesced_requests,
+            "coalesced_sentences": self._coalesced_sentences,
+            **self._cache.stats(),
+        }
+
     async def synthesize(
-        self, text: str, engine: str = "auto", voice: str = "default"
+        self,
+        text: str,
+        engine: str = "auto",
+        voice: str = "default",
+        output_format: str = "wav",
+        record_access: bool = True,
+        load: bool = True,
+    ) -> SynthesisResult:
+        """Synthesize text, sharing the work between identical concurrent calls.
+
+        Concurrent requests for the same (engine, voice, text, format) await
+        one synthesis instead of each running the engine. Requests are
+        counted in the access log unless ``record_access`` is false. With
+        ``load`` false a result cached as one entry comes back as its
+        ``file``, without reading the audio.
+        """
+        # Checked before engine selection so it is a 400, not an engine failure
+        if not has_speech(text):
+            raise ValueError("text contains nothing to synthesize")
+        engine = await self._route(engine, voice)
+        selected = self._select_engine(engine)
+        voice = self._voice_for(selected.engine_id, voice)
+        if record_access and self._access_log is not None:
+            self._access_log.record(engine, voice, text, output_format)
+        key = ("request", selected.engine_id, voice, selected.normalize(text).lower(), output_format)
+        task, coalesced = self._single_flight(
+            key, lambda: self._synthesize(text, engine, voice, output_format)
+        )
+        if coalesced:
+            self._coalesced_requests += 1
+        result = await asyncio.shield(task)
+        if result.file is None or not load:
+            return result
+        try:
+            audio = await asyncio.to_thread(result.file[0].read_bytes)
+        except FileNotFoundError:
+            # Expired since the lookup: synthesize it again
+            return await self.synthesize(text, engine, voice, output_format, record_access=False)
+        return replace(result, audio=audio, file=None)
+
+    def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable]
+    ) -> tuple[asyncio.Task, bool]:
+        """Return the in-flight task for ``key``, starting one if there is none.
+
+        Callers must await the task through ``asyncio.shield``: a cancelled
+        caller then stops waiting without cancelling the work for the others.
+        The second value tells whether an existing task was joined.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            return task, True
+
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+
+        def _done(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            # Mark the exception as retrieved in case every caller was cancelled
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_done)
+        return task, False
+
+    async def _synthesize(
+        self, text: str, engine: str, voice: str, output_format: str
     ) -> SynthesisResult:
+        """Synthesize text to ``output_format``, caching the whole result.
+
+        The result is stored as one cache entry, whose key is its audio ID.
+        A cached result is returned as its cache file, without reading it or
+        touching the engine or ffmpeg. Otherwise WAV is stitched from cached
+        sentences. If encoding fails the WAV result is returned instead.
+        """
         selected = self._select_engine(engine)
-        cached_audio = self._cache.get(selected.engine_id, voice, text)
-        if cached_audio:
+        variant = self._encoder.variant(output_format)
+        with stage("normalize"):
+            normalized = selected.normalize(text)
+        key = self._cache.key(
+            selected.engine_id, self._voice_for(selected.engine_id, voice), normalized, variant
+        )
+        with stage("cache_lookup"):
+            found = await self._cache.file(key)
+        if found:
+            n = len(split_sentences(text)) or 1
             return SynthesisResult(
-                audio=cached_audio,
+                audio=b"",
                 engine_used=selected.engine_id,
                 cached=True,
                 duration_ms=0,
+                sentences=n,
+                sentences_cached=n,
+                format=output_format,
+                audio_id=key,
+                file=found,
             )
 
-        t0 = time.monotonic()
+        result = await self._synthesize_wav(text, engine, voice)
+        if output_format == "wav":
+            return replace(result, audio_id=await self._store_whole(result, text, voice))
         try:
-            audio = await selected.synthesize(text, voice)
-        except Exception as exc:
-            if selected is not self._piper and self._piper and self._piper.is_available():
-                logger.warning("Falling back to Piper: %s", exc)
-                audio = await self._piper.synthesize(text, voice)
-                selected = self._piper
-            else:
-                raise
+            encoded = await self._encoder.encode(result.audio, output_format)
+        except RuntimeError:
+            logger.exception("Encoding to %s failed, returning WAV", output_format)
+            return result
+        used = self._engine_by_id(result.engine_used)
+        # After a fallback the audio belongs under the engine that produced it
+        voice = self._voice_for(result.engine_used, voice)
+        key = self._cache.key(result.engine_used, voice, used.normalize(text), variant)
+        # Whole results are served from their file, so they skip the memory tier
+        await self._cache.put_by_key(key, encoded, memory=False)
+        return replace(result, audio=encoded, format=output_format, audio_id=key)
+
+    async def _synthesize_wav(
+        self, text: str, engine: str = "auto", voice: str = "default"
+    ) -> SynthesisResult:
+        """Synthesize text, caching and reusing audio per sentence.
+
+        Sentences are normalized by the engine before lookup, so equivalent
+        spellings share a cache entry. Only sentences missing from the cache
+        are sent to the engine; the result is stitched together with a short
+        silence between sentences.
+        """
+        selected = self._select_engine(engine)
+        voice = self._voice_for(selected.engine_id, voice)
+        # Split the raw text: sentence detection relies on capitalization
+        with stage("normalize"):
+            sentences = [selected.normalize(s) for s in split_sentences(text) or [text]]
+        sentences = [s for s in sentences if has_speech(s)]
+        if not sentences:
+            raise ValueError("text contains nothing to synthesize")
+        with stage("cache_lookup"):
+            parts: list[bytes | None] = list(
+                await asyncio.gather(
+                    *(self._cache.get(selected.engine_id, voice, s) for s in sentences)
+                )
+            )
+        misses = [i for i, audio in enumerate(parts) if not audio]
+
+        t0 = time.monotonic()
+        if misses:
+            try:
+                # A failing sentence cancels the others, which a fallback would discard
+                async with asyncio.TaskGroup() as group:
+                    tasks = [
+                        group.create_task(self._synthesize_sentence(selected, sentences[i], voice))
+                        for i in misses
+                    ]
+            except ExceptionGroup as exc:
+                if selected is not self._piper and self._piper and self._piper.is_available():
+                    # Fall back for the whole text so the result has one voice
+                    logger.warning("Falling back to Piper: %s", exc.exceptions[0])
+                    return await self._synthesize_wav(text, "piper", voice)
+                raise exc.exceptions[0]
+            for i, task in zip(misses, tasks):
+                parts[i] = task.result()
+            await asyncio.gather(
+                *(self._cache.put(selected.engine_id, voice, sentences[i], parts[i]) for i in misses)
+            )
+        # Counted for the engine whose audio is returned, not for one that fell back
+        self._sentence_hits += len(sentences) - len(misses)
+        self._sentence_misses += len(misses)
 
         duration_ms = int((time.monotonic() - t0) * 1000)
-        self._cache.put(selected.engine_id, voice, text, audio)
         return SynthesisResult(
-            audio=audio,
+            audio=concat_wavs(parts, self._sentence_gap_ms),
             engine_used=selected.engine_id,
-            cached=False,
+            cached=not misses,
             duration_ms=duration_ms,
+            sentences=len(sentences),
+            sentences_cached=len(sentences) - len(misses),
+        )
+
+    async def synthesize_many(
+        self, requests: list[tuple[str, str, str, str]], load: bool = True
+    ) -> AsyncIterator[tuple[int, SynthesisResult | Exception]]:
+        """Synthesize (text, engine, voice, format) requests concurrently.
+
+        Yields (index, result) in completion order, so cache hits come back
+        immediately while misses are still queued at their engines. A failing
+        item yields its exception instead of aborting the others. ``load`` is
+        passed on to ``synthesize``.
+        """
+
+        async def one(i: int, request: tuple[str, str, str, str]):
+            try:
+                return i, await self.synthesize(*request, load=load)
+            except Exception as exc:
+                return i, exc
+
+        tasks = [asyncio.create_task(one(i, r)) for i, r in enumerate(requests)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def publish(self, result: SynthesisResult, text: str, voice: str) -> str:
+        """Make a result addressable and return its audio ID (the cache key)."""
+        if result.audio_id:
+            return result.audio_id
+        return await self._store_whole(result, text, voice)
+
+    async def _store_whole(self, result: SynthesisResult, text: str, voice: str) -> str:
+        """Store a WAV result as one entry unless it is there already; returns its key.
+
+        For more than one sentence this stores the stitched audio on disk next
+        to its sentence entries, roughly doubling the disk used for WAV, so
+        that hits and audio IDs are served from one file. It stays out of the
+        memory tier, which keeps holding only the sentences.
+        """
+        # A single sentence is already cached under this key
+        engine = self._engine_by_id(result.engine_used)
+        voice = self._voice_for(result.engine_used, voice)
+        key = self._cache.key(result.engine_used, voice, engine.normalize(text), "wav")
+        if not await self._cache.contains(key):
+            await self._cache.put_by_key(key, result.audio, memory=False)
+        return key
+
+    async def audio_file(self, audio_id: str) -> tuple[Path, os.stat_result] | None:
+        """Cache file holding the audio of ``audio_id``, if it is still cached."""
+        return await self._cache.file(audio_id)
+
+    async def _synthesize_sentence(self, selected: TTSEngine, sentence: str, voice: str) -> bytes:
+        """Run the engine for one sentence, joining an identical in-flight run.
+
+        The run is cancelled when its last caller is, e.g. after a fallback.
+        """
+        key = ("sentence", selected.engine_id, voice, sentence)
+        task, coalesced = self._single_flight(
+            key, lambda: self._run_engine(selected, sentence, voice)
         )
+        if coalesced:
+            self._coalesced_sentences += 1
+        self._sentence_waiters[task] = self._sentence_waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._sentence_waiters[task] -= 1
+            if not self._sentence_waiters[task]:
+                del self._sentence_waiters[task]
+                # Stop the engine once no caller wants the sentence any more
+                task.cancel()
+
+    async def _run_engine(self, selected: TTSEngine, sentence: str, voice: str) -> bytes:
+        engine_id = selected.engine_id
+        t0 = time.perf_counter()
+        with timed(f"synthesize_{engine_id}", SYNTHESIS_SECONDS, engine=engine_id):
+            audio = await selected.synthesize(sentence, voice)
+        # Wall time, so batched engines include their batching window
+        observe_realtime(engine_id, wav_duration(audio), time.perf_counter() - t0)
+        return audio
+
+    async def synthesize_stream(
+        self, text: str, engine: str = "auto", voice: str = "default"
+    ) -> AsyncIterator[tuple[bytes, int]]:
+        """Synthesize sentence by sentence, yielding (PCM, sample rate) in order.
+
+        Up to ``stream_lookahead`` sentences are synthesized ahead of the one
+        being yielded, so the engine keeps working while the client consumes
+        audio. Every sentence goes through ``synthesize`` and thus the cache.
+        All chunks are resampled to the sample rate of the first sentence.
+        """
+        sentences = [s for s in split_sentences(text) if has_speech(s)]
+        if not sentences:
+            raise ValueError("text contains nothing to synthesize")
+        engine = await self._route(engine, voice)
+        self._select_engine(engine)  # fail fast on an invalid engine
+        pending: list[asyncio.Task[SynthesisResult]] = []
+        stream_rate = 0
+        try:
+            for i in range(len(sentences)):
+                while len(pending) < self._stream_lookahead and i + len(pending) < len(sentences):
+                    sentence = sentences[i + len(pending)]
+                    pending.append(asyncio.create_task(self.synthesize(sentence, engine, voice)))
+                result = await pending.pop(0)
+                pcm, rate = wav_to_pcm(result.audio)
+                if not stream_rate:
+                    stream_rate = rate
+                elif rate != stream_rate:
+                    logger.warning("Resampling sentence from %d to %d Hz", rate, stream_rate)
+                    pcm = resample_pcm(pcm, rate, stream_rate)
+                yield pcm, stream_rate
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _route(self, engine: str, voice: str) -> str:
+        """Engine for a request: a named voice is a Piper voice, so it goes to Piper.
+
+        Parkiet has no voices and would ignore one, also with engine "auto".
+        Raises ValueError for an unknown voice or one Parkiet was asked for.
+        """
+        if voice == "default":
+            return engine
+        if not self._piper:
+            raise ValueError(f"Unknown voice: {voice}")
+        await self._piper.find_voice(voice)
+        if engine == "parkiet":
+            raise ValueError(f"Voice {voice} is only available with engine piper")
+        return "piper"
+
+    def _voice_for(self, engine_id: str, voice: str) -> str:
+        """Voice as it appears in cache keys.
+
+        Piper's "default" becomes its voice ID, so both spellings share entries.
+        """
+        if engine_id == "piper" and voice == "default" and self._piper:
+            return self._piper.voice_id(voice)
+        return voice
+
+    def _engine_by_id(self, engine_id: str) -> TTSEngine:
+        engine = self._piper if engine_id == "piper" else self._parkiet
+        if engine is None:
+            raise ValueError(f"Engine {engine_id} is not enabled")
+        return engine
 
     def _select_engine(self, engine: str) -> TTSEngine:
         if engine == "piper":
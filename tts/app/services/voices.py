@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Voice:
+    id: str                # file name without .onnx, e.g. "nl_NL-pim-medium"
+    model_path: str
+    sample_rate: int
+    language: str
+    quality: str           # Piper quality: "x_low" | "low" | "medium" | "high"
+    size_bytes: int        # model file size, used as its memory estimate
+
+
+class VoiceRegistry:
+    """Piper voices in ``models_dir`` and which of them are resident.
+
+    Every ``<voice>.onnx`` with a ``<voice>.onnx.json`` config next to it is
+    a voice. A voice becomes resident on first use; once more than
+    ``max_resident`` voices are resident, or their model files together
+    exceed ``memory_budget_bytes`` (0 = no limit), the least recently used
+    ones are evicted. The default voice is never evicted. The registry only
+    decides the resident set; the engine passes it to its workers, which
+    load and drop voices to match.
+    """
+
+    def __init__(
+        self,
+        models_dir: str,
+        default_voice: str,
+        max_resident: int = 4,
+        memory_budget_bytes: int = 0,
+        rescan_interval: float = 30,
+    ) -> None:
+        self._root = Path(models_dir)
+        self._default = default_voice
+        self._max_resident = max(1, max_resident)
+        self._budget = memory_budget_bytes
+        self._rescan_interval = rescan_interval
+        self._scanned_at = 0.0
+        self._voices: dict[str, Voice] = {}
+        # voice ID -> last use (monotonic), least recently used first
+        self._resident: OrderedDict[str, float] = OrderedDict()
+
+    async def scan(self) -> None:
+        """(Re)read the voices in ``models_dir``; the reading runs in a thread."""
+        self._scanned_at = time.monotonic()
+        voices = await asyncio.to_thread(self._read)
+        self._voices = voices
+        for voice_id in [v for v in self._resident if v not in voices]:
+            del self._resident[voice_id]
+        if self._default not in voices:
+            logger.error("Default Piper voice %s not found in %s", self._default, self._root)
+        logger.info("Found %d Piper voices in %s", len(voices), self._root)
+
+    def _read(self) -> dict[str, Voice]:
+        voices = {}
+        for path in sorted(self._root.glob("*.onnx")):
+            config_path = path.with_name(f"{path.name}.json")
+            try:
+                config = json.loads(config_path.read_text())
+                size = path.stat().st_size
+            except (OSError, ValueError):
+                logger.warning("Skipping Piper voice %s without a readable config", path.name)
+                continue
+            voices[path.stem] = Voice(
+                id=path.stem,
+                model_path=str(path),
+                sample_rate=config.get("audio", {}).get("sample_rate", 22050),
+                language=config.get("language", {}).get("code", ""),
+                quality=config.get("audio", {}).get("quality", ""),
+                size_bytes=size,
+            )
+        return voices
+
+    @property
+    def default(self) -> Voice | None:
+        return self._voices.get(self._default)
+
+    def get(self, voice: str) -> Voice:
+        """The voice named ``voice``; "default" is the configured default voice.
+
+        Raises ValueError for a voice the last scan did not find.
+        """
+        found = self._voices.get(self._default if voice == "default" else voice)
+        if found is None:
+            raise ValueError(f"Unknown voice: {voice}")
+        return found
+
+    async def find(self, voice: str) -> Voice:
+        """Like ``get``, but first rescans for a voice added since the last scan."""
+        voice_id = self._default if voice == "default" else voice
+        stale = time.monotonic() - self._scanned_at >= self._rescan_interval
+        if voice_id not in self._voices and stale:
+            # Rate-limited, as any client can ask for an unknown voice
+            await self.scan()
+        return self.get(voice)
+
+    def use(self, voice: Voice) -> tuple[str, ...]:
+        """Mark ``voice`` as used; returns the model paths that should be resident."""
+        self._resident[voice.id] = time.monotonic()
+        self._resident.move_to_end(voice.id)
+        self._evict(keep=voice.id)
+        return self.resident_paths()
+
+    def discard(self, voice: Voice) -> None:
+        """Forget a voice that failed to load."""
+        self._resident.pop(voice.id, None)
+
+    def resident_paths(self) -> tuple[str, ...]:
+        return tuple(self._voices[v].model_path for v in self._resident)
+
+    def _evict(self, keep: str) -> None:
+        def over() -> bool:
+            used = sum(self._voices[v].size_bytes for v in self._resident)
+            return len(self._resident) > self._max_resident or bool(
+                self._budget and used > self._budget
+            )
+
+        for voice_id in list(self._resident):
+            if not over():
+                break
+            if voice_id in (keep, self._default):
+                continue
+            logger.info("Evicting Piper voice %s", voice_id)
+            del self._resident[voice_id]
+
+    def status(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "id": v.id,
+                "language": v.language,
+                "quality": v.quality,
+                "sample_rate": v.sample_rate,
+                "size_bytes": v.size_bytes,
+                "default": v.id == self._default,
+                "resident": v.id in self._resident,
+                "idle_seconds": (
+                    round(now - self._resident[v.id], 1) if v.id in self._resident else None
+                ),
+            }
+            for v in self._voices.values()
+        ]
@@ -0,0 +1,138 @@
+"""Load driver and JSON reporting shared by the end-to-end benchmarks.
+
+tts/benchmarks/harness.py and stt/benchmarks/harness.py are kept identical:
+each service is built from its own directory, so neither can import the
+other's copy. Change both together.
+"""
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+# Metrics compared against a baseline; True when higher is better
+COMPARED = {
+    "throughput_rps": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "realtime_factor.p50": True,
+}
+
+
+@dataclass
+class Sample:
+    latency_s: float
+    audio_s: float
+    error: str | None = None
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[float]], requests: int, concurrency: int
+) -> tuple[list[Sample], float]:
+    """Run ``call(i)`` for i in range(requests), at most ``concurrency`` at a time.
+
+    ``call`` returns the seconds of audio the request handled. An exception
+    counts as an error; an ``httpx.HTTPStatusError`` is recorded by status.
+    Returns the samples and the wall time of the whole run.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[Sample] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                audio_s = await call(i)
+            except Exception as exc:
+                response = getattr(exc, "response", None)
+                kind = str(response.status_code) if response is not None else type(exc).__name__
+                samples.append(Sample(time.perf_counter() - t0, 0.0, kind))
+                return
+            samples.append(Sample(time.perf_counter() - t0, audio_s))
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return samples, time.perf_counter() - t_start
+
+
+def summarize(samples: list[Sample], wall_s: float) -> dict:
+    ok = [s for s in samples if s.error is None]
+    latencies = [s.latency_s * 1000 for s in ok]
+    rtf = [s.audio_s / s.latency_s for s in ok if s.audio_s and s.latency_s]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "errors_by_kind": dict(Counter(s.error for s in samples if s.error)),
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(ok) / wall_s, 2) if wall_s else 0.0,
+        "audio_seconds_per_s": round(sum(s.audio_s for s in ok) / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+        },
+        # Audio seconds per second of end-to-end latency, per request
+        "realtime_factor": {
+            "p50": round(percentile(rtf, 50), 3),
+            "mean": round(sum(rtf) / len(rtf), 3) if rtf else 0.0,
+        },
+    }
+
+
+def _lookup(results: dict, path: str) -> float | None:
+    value = results
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print current vs. baseline and return the metrics that regressed by more than ``tolerance``."""
+    regressions = []
+    print(f"{'metric':<22} {'baseline':>10} {'current':>10} {'change':>8}", file=sys.stderr)
+    for path, higher_is_better in COMPARED.items():
+        old, new = _lookup(baseline, path), _lookup(results, path)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        print(f"{path:<22} {old:>10.2f} {new:>10.2f} {change:>+7.1%}{flag}", file=sys.stderr)
+        if flag:
+            regressions.append(path)
+    return regressions
+
+
+def emit(report: dict, output: str | None, baseline: str | None, tolerance: float) -> int:
+    """Write the report as JSON and compare it with a baseline report.
+
+    Returns the process exit code: 1 if any compared metric regressed.
+    """
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if not baseline:
+        return 0
+    with open(baseline) as f:
+        base = json.load(f)
+    regressions = compare(report["results"], base["results"], tolerance)
+    return 1 if regressions else 0
@@ -0,0 +1,149 @@
+"""Benchmark: end-to-end load test of POST /api/tts/synthesize.
+
+By default the FastAPI app runs in-process with stub engines, so it needs no
+models or GPU; with --url it drives a running service instead. Results are
+printed as JSON; --baseline compares them with an earlier run and exits with
+status 1 on a regression. Needs benchmarks/requirements.txt installed.
+Run from the tts directory:
+
+    python -m benchmarks.load --requests 200 --concurrency 16 --hit-ratio 0.5
+    python -m benchmarks.load --output after.json --baseline before.json
+    python -m benchmarks.load --url http://localhost:8002 --engine piper
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.metrics import MetricsMiddleware
+from app.routers.tts import router
+from app.services.audio import wav_duration
+from app.services.audio_cache import AudioCache
+from app.services.engines.parkiet import ParkietEngine
+from app.services.tts_service import TTSService
+from benchmarks.harness import emit, run_load, summarize
+from benchmarks.stubs import StubPipeline, StubPiper
+
+_WORDS = (
+    "het kabinet presenteert vandaag de plannen voor zorg onderwijs en wonen "
+    "in het oosten wordt zware regen verwacht terwijl het westen droog blijft"
+).split()
+
+
+def _text(rng: random.Random, chars: int, serial: int) -> str:
+    """A text of about ``chars`` characters whose sentences occur nowhere else."""
+    sentences = []
+    length = 0
+    n = 0
+    while length < chars:
+        words = rng.choices(_WORDS, k=rng.randint(6, 14))
+        sentence = f"Bericht {serial} deel {n} over {' '.join(words)}."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+        n += 1
+    return " ".join(sentences)
+
+
+def _build_app(args: argparse.Namespace, cache_dir: str) -> tuple[FastAPI, ParkietEngine]:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    piper = StubPiper(workers=args.piper_workers, seconds_per_char=args.piper_ms_per_char / 1000)
+    parkiet = ParkietEngine(
+        batch_window_ms=args.batch_window_ms,
+        pipeline_factory=lambda: StubPipeline(0.2, 0.05, 0.1),
+    )
+    app.state.tts = TTSService(piper, parkiet, AudioCache(cache_dir), "piper")
+    return app, parkiet
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="benchmark a running service instead of stubs")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--engine", default="piper", help="piper | parkiet | auto")
+    parser.add_argument("--format", default="wav", help="output_format: wav | mp3 | opus")
+    parser.add_argument(
+        "--text-chars", default="60,200,600",
+        help="comma-separated text lengths, each request picks one at random",
+    )
+    parser.add_argument(
+        "--hit-ratio", type=float, default=0.3,
+        help="fraction of requests that repeat a text cached during warmup",
+    )
+    parser.add_argument("--hot-texts", type=int, default=20, help="texts cached during warmup")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--piper-workers", type=int, default=2, help="stub Piper concurrency")
+    parser.add_argument("--piper-ms-per-char", type=float, default=0.5, help="stub Piper cost")
+    parser.add_argument("--batch-window-ms", type=float, default=50, help="stub Parkiet window")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="allowed relative regression vs. baseline"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lengths = [int(n) for n in args.text_chars.split(",")]
+    # Hot texts use negative serials so fresh texts never collide with them
+    hot = [_text(rng, rng.choice(lengths), -i - 1) for i in range(args.hot_texts)]
+    workload = [
+        rng.choice(hot) if rng.random() < args.hit_ratio else _text(rng, rng.choice(lengths), i)
+        for i in range(args.requests)
+    ]
+
+    parkiet = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=300)
+    else:
+        cache_dir = tempfile.mkdtemp(prefix="tts-bench-")
+        app, parkiet = _build_app(args, cache_dir)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=300
+        )
+
+    cached = 0
+
+    async def synthesize(text: str) -> httpx.Response:
+        response = await client.post(
+            "/api/tts/synthesize",
+            json={"text": text, "engine": args.engine, "output_format": args.format},
+        )
+        response.raise_for_status()
+        return response
+
+    async def call(i: int) -> float:
+        nonlocal cached
+        response = await synthesize(workload[i])
+        cached += response.headers.get("X-Cached") == "true"
+        if args.format != "wav":
+            return 0.0  # duration is only read from WAV headers
+        return wav_duration(response.content)
+
+    try:
+        for text in hot:
+            await synthesize(text)
+        samples, wall = await run_load(call, args.requests, args.concurrency)
+    finally:
+        await client.aclose()
+        if parkiet is not None:
+            parkiet.close()
+
+    results = summarize(samples, wall)
+    results["cache_hit_ratio"] = round(cached / args.requests, 3) if args.requests else 0.0
+    report = {
+        "benchmark": "tts.load",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": results,
+    }
+    raise SystemExit(emit(report, args.output, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
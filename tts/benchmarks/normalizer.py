@@ -0,0 +1,76 @@
+"""Micro-benchmark: Parkiet text normalization, regex chain vs. single-pass tokenizer.
+
+Also checks that both produce the same output on the sample corpus. Run from
+the tts directory:
+
+    python -m benchmarks.normalizer
+"""
+import argparse
+import re
+import timeit
+
+from app.services.engines.parkiet import (
+    _expand_abbreviation,
+    _normalize_for_parkiet,
+    _number_to_words,
+)
+
+SAMPLES = [
+    "Het is 2026 en de PZC meldt dat 3,5 procent van de NOS-kijkers 😀 afhaakt.",
+    "[S1] Goedemorgen! Kijk op https://nos.nl/artikel/123 voor meer. [S2] Mail naar info@example.nl.",
+    "De AEX sloot op 912,45 punten;  de    koers van ASML steeg met 2 procent…",
+    "Dit is een gewone zin zonder getallen of afkortingen, maar wel (met) haakjes.",
+]
+
+# The multi-pass implementation this repo used before the tokenizer
+_RE_URL = re.compile(r"https?://\S+", re.IGNORECASE)
+_RE_EMAIL = re.compile(r"\S+@\S+\.\S+")
+_RE_ABBREV = re.compile(r"\b([A-Z]{2,})\b")
+_RE_NUMBER = re.compile(r"\b\d+([.,]\d+)?\b")
+_RE_SPECIAL = re.compile(r"[^\w\s.,!?;:'\-()…]")
+
+
+def legacy_normalize(text: str) -> str:
+    tags: list[str] = []
+
+    def _save_tag(m: re.Match) -> str:
+        tags.append(m.group(0))
+        return f"__TAG{len(tags) - 1}__"
+
+    text = re.sub(r"\[S\d\]", _save_tag, text)
+    text = _RE_URL.sub("link", text)
+    text = _RE_EMAIL.sub("e-mailadres", text)
+    text = _RE_ABBREV.sub(lambda m: _expand_abbreviation(m.group(1)), text)
+    text = _RE_NUMBER.sub(lambda m: _number_to_words(m.group(0)), text)
+    text = text.lower()
+    text = _RE_SPECIAL.sub("", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    for i, tag in enumerate(tags):
+        text = text.replace(f"__tag{i}__", tag)
+    return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    tokenizer = _normalize_for_parkiet.__wrapped__
+    for sample in SAMPLES:
+        old, new = legacy_normalize(sample), tokenizer(sample)
+        if old != new:
+            print(f"DIFF\n  legacy:    {old}\n  tokenizer: {new}")
+
+    variants = (
+        ("regex chain", legacy_normalize),
+        ("tokenizer", tokenizer),
+        ("memoized", _normalize_for_parkiet),
+    )
+    for label, fn in variants:
+        seconds = timeit.timeit(lambda: [fn(s) for s in SAMPLES], number=args.number)
+        per_call_us = seconds / (args.number * len(SAMPLES)) * 1e6
+        print(f"{label:>12}: {per_call_us:7.2f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: Parkiet micro-batching throughput against batch window.
+
+Uses a CPU stub pipeline whose forward pass costs a fixed overhead plus a
+smaller per-item cost, which is how a batched GPU pass behaves. Run from the
+tts directory:
+
+    python -m benchmarks.parkiet_batching --requests 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.engines.parkiet import ParkietEngine
+from benchmarks.stubs import StubPipeline
+
+
+async def _run(engine: ParkietEngine, requests: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await engine.synthesize(f"Dit is testzin nummer {i}.")
+            latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - t_start
+    latencies.sort()
+    return {
+        "requests_per_s": requests / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=200, help="stub cost per forward pass")
+    parser.add_argument("--per-item-ms", type=float, default=20, help="stub cost per batch item")
+    parser.add_argument("--windows", default="0,10,25,50,100", help="batch windows in ms")
+    args = parser.parse_args()
+
+    for window in (float(w) for w in args.windows.split(",")):
+        engine = ParkietEngine(
+            batch_window_ms=window,
+            max_batch=args.max_batch,
+            pipeline_factory=lambda: StubPipeline(args.base_ms / 1000, args.per_item_ms / 1000),
+        )
+        try:
+            stats = await _run(engine, args.requests, args.concurrency)
+        finally:
+            engine.close()
+        print(
+            f"window {window:5.0f} ms: {stats['requests_per_s']:6.1f} req/s  "
+            f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+        )
+    print(f"(max batch {args.max_batch}, concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""Benchmark: Parkiet end-to-end latency against text length, chunked vs. whole.
+
+Uses the CPU stub pipeline, whose cost grows quadratically with prompt length
+like an autoregressive model. Run from the tts directory:
+
+    python -m benchmarks.parkiet_chunking
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.engines.parkiet import ParkietEngine
+from benchmarks.stubs import StubPipeline
+
+SENTENCE = "Het kabinet presenteert vandaag de plannen voor het nieuwe jaar. "
+
+
+async def _latency(engine: ParkietEngine, text: str) -> float:
+    t0 = time.perf_counter()
+    await engine.synthesize(text)
+    return (time.perf_counter() - t0) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", default="250,500,1000,2000,4000", help="text lengths in chars")
+    parser.add_argument("--max-chunk-chars", type=int, default=300)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--base-ms", type=float, default=100)
+    parser.add_argument("--per-item-ms", type=float, default=20)
+    parser.add_argument("--quadratic-ms", type=float, default=30, help="cost per (100 chars)^2")
+    args = parser.parse_args()
+
+    def factory() -> StubPipeline:
+        return StubPipeline(args.base_ms / 1000, args.per_item_ms / 1000, args.quadratic_ms / 1000)
+
+    chunked = ParkietEngine(
+        batch_window_ms=5, max_batch=args.max_batch,
+        max_chunk_chars=args.max_chunk_chars, pipeline_factory=factory,
+    )
+    whole = ParkietEngine(max_batch=1, max_chunk_chars=10**6, pipeline_factory=factory)
+    try:
+        print(f"{'chars':>6} {'whole ms':>10} {'chunked ms':>11}")
+        for length in (int(n) for n in args.lengths.split(",")):
+            text = (SENTENCE * (length // len(SENTENCE) + 1))[:length]
+            print(f"{length:>6} {await _latency(whole, text):>10.0f} {await _latency(chunked, text):>11.0f}")
+    finally:
+        chunked.close()
+        whole.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
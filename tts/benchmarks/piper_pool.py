@@ -0,0 +1,79 @@
+"""Benchmark: Piper worker pool vs. one piper subprocess per request.
+
+Run from the tts directory (inside the container, or with piper-tts installed):
+
+    python -m benchmarks.piper_pool --model /app/models/nl_NL-pim-medium.onnx
+
+With ``--voices`` requests rotate over several voices from the same
+directory, which shows the cost of loading and evicting voices when more
+are used than ``--max-voices`` keeps resident.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from app.services.engines.piper import PiperEngine
+from app.services.voices import VoiceRegistry
+
+SAMPLE_TEXTS = [
+    "Goedemorgen, dit is het nieuws van vandaag.",
+    "Het kabinet presenteert vandaag de plannen voor het nieuwe jaar.",
+    "In het oosten van het land wordt vanmiddag zware regen verwacht.",
+    "Bedankt voor je bericht, ik kom er zo snel mogelijk op terug.",
+]
+
+
+async def _run(engine: PiperEngine, requests: int, concurrency: int, voices: list[str]) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await engine.synthesize(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)], voices[i % len(voices)])
+            latencies.append(time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - t_start
+
+    latencies.sort()
+    return {
+        "requests_per_s": requests / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", required=True, help="path to the Piper .onnx voice")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4, help="pool size to compare")
+    parser.add_argument(
+        "--voices", default="", help="comma-separated voices to rotate over (default: --model)"
+    )
+    parser.add_argument("--max-voices", type=int, default=4, help="resident voices per worker")
+    args = parser.parse_args()
+    model = Path(args.model)
+    voices = [v.strip() for v in args.voices.split(",") if v.strip()] or ["default"]
+
+    for label, workers in (("subprocess", 0), (f"pool({args.workers})", args.workers)):
+        registry = VoiceRegistry(str(model.parent), model.stem, max_resident=args.max_voices)
+        engine = PiperEngine(registry, workers=workers)
+        await engine.start()
+        try:
+            stats = await _run(engine, args.requests, args.concurrency, voices)
+        finally:
+            engine.close()
+        print(
+            f"{label:>12}: {stats['requests_per_s']:6.1f} req/s  "
+            f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
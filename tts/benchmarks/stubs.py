@@ -0,0 +1,57 @@
+"""CPU stand-ins for the real models, shared by the benchmarks."""
+import asyncio
+import time
+
+import numpy as np
+
+from app.services.audio import pcm_to_wav
+from app.services.engines.piper import PiperEngine
+from app.services.voices import VoiceRegistry
+
+
+class StubPipeline:
+    """Fake transformers TTS pipeline.
+
+    A call sleeps ``base + per_item * n + quadratic * (longest / 100 chars)^2``
+    seconds, approximating a batched autoregressive model whose cost grows
+    with prompt length, and returns 1 s of silence per text.
+    """
+
+    def __init__(self, base_s: float, per_item_s: float, quadratic_s: float = 0.0) -> None:
+        self._base = base_s
+        self._per_item = per_item_s
+        self._quadratic = quadratic_s
+
+    def __call__(self, texts: list[str], batch_size: int = 1) -> list[dict]:
+        longest = max(len(t) for t in texts) / 100
+        time.sleep(self._base + self._per_item * len(texts) + self._quadratic * longest**2)
+        return [{"audio": np.zeros(24000, dtype=np.float32), "sampling_rate": 24000} for _ in texts]
+
+
+class StubPiper(PiperEngine):
+    """Piper stand-in without a voice model.
+
+    Runs at most ``workers`` syntheses at a time, like the worker pool. Each
+    takes ``seconds_per_char * len(text)`` and returns ``audio_per_char``
+    seconds of silence per character at 22.05 kHz.
+    """
+
+    def __init__(
+        self, workers: int = 2, seconds_per_char: float = 0.0005, audio_per_char: float = 0.06
+    ) -> None:
+        super().__init__(VoiceRegistry("", "stub"), workers=0)
+        self._slots = asyncio.Semaphore(max(1, workers))
+        self._seconds_per_char = seconds_per_char
+        self._audio_per_char = audio_per_char
+
+    def voice_id(self, voice: str) -> str:
+        return voice  # every voice sounds the same
+
+    async def find_voice(self, voice: str) -> str:
+        return voice
+
+    async def synthesize(self, text: str, voice: str = "default") -> bytes:
+        async with self._slots:
+            await asyncio.sleep(self._seconds_per_char * len(text))
+        frames = int(22050 * self._audio_per_char * len(text))
+        return pcm_to_wav(bytes(frames * 2), 22050)